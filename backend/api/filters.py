@@ -1,10 +1,15 @@
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db.models import Exists, OuterRef
 from django_filters.fields import MultipleChoiceField
 from django_filters.rest_framework import CharFilter, FilterSet, filters
 from django_filters.widgets import BooleanWidget
 
+from recipes.fulltext import search_recipes
 from recipes.models import Ingredient, Recipe
 
+User = get_user_model()
+
 
 class IngredientFilter(FilterSet):
     name = CharFilter(field_name='name', lookup_expr='icontains')
@@ -30,13 +35,28 @@ class TagsMultipleChoiceField(MultipleChoiceField):
                 )
 
 
-class TagsFilter(filters.AllValuesMultipleFilter):
+class TagsFilter(filters.Filter):
+    """Рецепты хотя бы с одним из тегов, без JOIN и DISTINCT по рецептам.
+
+    Неизвестные слаги пропускаются: они не найдутся в подзапросе к тегам.
+    """
     field_class = TagsMultipleChoiceField
 
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return qs.annotate(has_tags=Exists(
+            Recipe.tags.through.objects.filter(
+                recipe=OuterRef('pk'),
+                tag__slug__in=value
+            )
+        )).filter(has_tags=True)
+
 
 class RecipeFilter(FilterSet):
-    author = filters.AllValuesMultipleFilter(
-        field_name='author__id',
+    author = filters.ModelMultipleChoiceFilter(
+        queryset=User.objects.all(),
+        distinct=False,
         label='Автор'
     )
     is_in_shopping_cart = filters.BooleanFilter(
@@ -48,7 +68,17 @@ class RecipeFilter(FilterSet):
         label='В избранных.'
     )
     tags = TagsFilter(field_name='tags__slug')
+    search = CharFilter(method='filter_search', label='Поиск')
 
     class Meta:
         model = Recipe
-        fields = ['author', 'tags', 'is_in_shopping_cart', 'is_favorited']
+        fields = [
+            'author',
+            'tags',
+            'is_in_shopping_cart',
+            'is_favorited',
+            'search'
+        ]
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
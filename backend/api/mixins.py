@@ -1,4 +1,17 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from rest_framework import mixins, viewsets
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from foodgram.db.routers import (is_pinned, pin_to_primary, primary_reads,
+                                 replica_reads)
+from foodgram.performance import timed
+from recipes.versions import get_version
 
 
 class ListRetrieveViewSet(
@@ -9,34 +22,97 @@ class ListRetrieveViewSet(
     ...
 
 
+class CachedReadMixin:
+    """Кеширует ответы list и retrieve до изменения данных модели.
+
+    Версия данных хранится в кеше и обновляется сигналами модели. По ней
+    строятся ETag и Last-Modified, на совпадающий условный запрос
+    отдаётся 304 без обращения к базе.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+    def get_cached_response(self, request, method, *args, **kwargs):
+        model = self.queryset.model
+        version = get_version(model)
+        path = request.get_full_path()
+        etag = '"{}"'.format(
+            md5(f'{path}:{version}'.encode()).hexdigest()
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(version)
+        )
+        if response is None:
+            key = f'{model._meta.label_lower}:{version}:{path}'
+            data = cache.get(key)
+            if data is None:
+                with primary_reads():
+                    response = method(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(key, response.data, settings.READ_CACHE_TIMEOUT)
+            else:
+                response = Response(data)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(version)
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+class ReplicaReadMixin:
+    """Выполняет чтения безопасных запросов на репликах базы.
+
+    После успешного изменяющего запроса пользователь на
+    REPLICA_PIN_TIMEOUT секунд закрепляется за основной базой, чтобы
+    видеть свои изменения, пока реплики отстают.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = replica_reads.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            replica_reads.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not (
+            request.user.is_authenticated and is_pinned(request.user)
+        ):
+            replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            response.status_code < 400
+            and request.method not in SAFE_METHODS
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
 class GetIsSubscribedMixin:
     def get_is_subscribed(self, obj):
+        is_subscribed = getattr(obj, 'is_subscribed', None)
+        if is_subscribed is not None:
+            return is_subscribed
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
         return user.follower.filter(author=obj.id).exists()
 
 
-class AddAndDeleteObjectMixin:
-    def add_object_method(self, request, pk, serializer_class, model):
-        data = {
-            'user': request.user.id,
-            'recipe': pk,
-        }
-        serializer = serializer_class(
-            data=data,
-            context={'request': request}
-        )
-        serializer.is_valid(raise_exception=True)
-        return self.add_object(model, request.user, pk)
-
-    def delete_object_method(self, request, pk, serializer_class, model):
-        data = {
-            'user': request.user.id,
-            'recipe': pk,
-        }
-        serializer = serializer_class(
-            data=data, context={'request': request}
-        )
-        serializer.is_valid(raise_exception=True)
-        return self.delete_object(model, request.user, pk)
+class TimedSerializerMixin:
+    """Учитывает время сериализации в метрике serialize Server-Timing."""
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
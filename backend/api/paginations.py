@@ -1,6 +1,139 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class LimitPageNumberPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу сортировки без OFFSET и без COUNT(*).
+
+    Курсор хранит значения полей ordering последней строки страницы,
+    следующая страница выбирается условием на эти поля.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size = 6
+    page_size_query_param = 'limit'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.count = None
+        if request.query_params.get(self.count_query_param) == 'true':
+            self.count = queryset.count()
+        queryset = queryset.order_by(*self.ordering)
+        values = self.decode_cursor(request)
+        if values is not None:
+            try:
+                queryset = queryset.filter(self.get_after_filter(values))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+        page_size = self.get_page_size(request)
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        self.page = page[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        response = {'next': self.get_next_link(), 'results': data}
+        if self.count is not None:
+            response['count'] = self.count
+        return Response(response)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return page_size if page_size > 0 else self.page_size
+
+    def get_after_filter(self, values):
+        after = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            after |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return after
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [
+            str(getattr(last, field.lstrip('-'))) for field in self.ordering
+        ]
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            urlsafe_b64encode(json.dumps(values).encode()).decode()
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode()))
+        except (BinasciiError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+
+class OptionalKeysetPagination(LimitPageNumberPagination):
+    """Постраничная пагинация, с параметром cursor - пагинация по ключу.
+
+    Параметры из page_only_params задают свой порядок строк, которого
+    нет в курсоре, поэтому с ними всегда постраничная пагинация.
+    """
+    ordering = ()
+    page_only_params = ()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (
+            KeysetPagination.cursor_query_param in request.query_params
+            and not any(
+                request.query_params.get(param)
+                for param in self.page_only_params
+            )
+        ):
+            self.keyset = KeysetPagination(self.ordering)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class RecipePagination(OptionalKeysetPagination):
+    ordering = ('-pub_date', '-id')
+    page_only_params = ('search',)
+
+
+class SubscriptionPagination(OptionalKeysetPagination):
+    ordering = ('id',)
+
+
+class FeedPagination(KeysetPagination):
+    def __init__(self):
+        super().__init__(('-pub_date', '-recipe_id'))
@@ -1,12 +1,27 @@
+import json
+import os
+import uuid
+
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.http import QueryDict
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
-from recipes.models import (FavoriteRecipe, Ingredient, IngredientAmount,
-                            Recipe, ShoppingCart, Tag)
+from recipes.cart import change_recipe_in_cart_totals
+from recipes.feed import add_recipe_to_feeds
+from recipes.images import thumbnail_names
+from foodgram.settings import BULK_LIMIT
+from recipes.models import Ingredient, IngredientAmount, Recipe, Tag
+from recipes.search import recipe_ingredient_index
+from recipes.similarity import update_similar_recipes
 from users.models import Follow
-from .mixins import GetIsSubscribedMixin
+from users.stats import change_user_stats
+from .mixins import GetIsSubscribedMixin, TimedSerializerMixin
+from .uploads import RejectedUploadedFile
 
 User = get_user_model()
 
@@ -40,6 +55,53 @@ class UserViewSerializer(GetIsSubscribedMixin, UserSerializer):
         read_only_fields = ['is_subscribed']
 
 
+class ThumbnailsField(serializers.Field):
+    """Ссылки на уменьшенные копии картинки рецепта по размерам и форматам.
+
+    Пока фоновая обработка не отметила копии готовыми в thumbnails_image,
+    все ссылки ведут на исходную картинку. Хранилище не опрашивается.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        if not recipe.image:
+            return None
+        name = recipe.image.name
+        ready = recipe.thumbnails_image == name
+        return {
+            size: {
+                image_format: self.get_url(thumbnail if ready else name)
+                for image_format, thumbnail in formats.items()
+            }
+            for size, formats in thumbnail_names(name).items()
+        }
+
+    def get_url(self, name):
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class RecipeImageField(Base64ImageField):
+    """Картинка рецепта: строка base64 или файл из multipart-запроса."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, RejectedUploadedFile):
+            raise serializers.ValidationError(data.error)
+        if isinstance(data, UploadedFile):
+            image = serializers.ImageField.to_internal_value(self, data)
+            extension = os.path.splitext(image.name)[1].lower()
+            image.name = f'{uuid.uuid4()}{extension}'
+            return image
+        return super().to_internal_value(data)
+
+
 class IngredientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ingredient
@@ -69,7 +131,8 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         ]
 
 
-class RecipeReadSerializer(serializers.ModelSerializer):
+class RecipeReadSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
     author = UserViewSerializer()
     tags = TagSerializer(many=True)
     ingredients = RecipeIngredientSerializer(
@@ -79,10 +142,11 @@ class RecipeReadSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.BooleanField(default=False)
     is_in_shopping_cart = serializers.BooleanField(default=False)
+    thumbnails = ThumbnailsField()
 
     class Meta:
         model = Recipe
-        fields = '__all__'
+        exclude = ['thumbnails_image']
 
 
 class RecipeIngredientCreateSerializer(serializers.ModelSerializer):
@@ -102,36 +166,74 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         many=True
     )
     ingredients = RecipeIngredientCreateSerializer(many=True)
-    image = Base64ImageField()
+    image = RecipeImageField()
 
     class Meta:
         model = Recipe
         fields = '__all__'
         read_only_fields = ('author',)
 
+    def to_internal_value(self, data):
+        if isinstance(data, QueryDict):
+            data = self.multipart_to_dict(data)
+        return super().to_internal_value(data)
+
+    def multipart_to_dict(self, data):
+        """Приводит multipart-форму к виду JSON-запроса.
+
+        Теги передаются повторяющимся полем tags, ингредиенты — строкой
+        JSON в поле ingredients.
+        """
+        result = data.dict()
+        if 'tags' in data:
+            result['tags'] = data.getlist('tags')
+        if 'ingredients' in data:
+            try:
+                result['ingredients'] = json.loads(data['ingredients'])
+            except ValueError:
+                raise serializers.ValidationError({
+                    'ingredients': ['Ожидается список ингредиентов в JSON.']
+                })
+        return result
+
     def validate(self, data):
-        if not data.get('tags'):
+        if 'tags' in data and not data['tags']:
             raise serializers.ValidationError(
                 'Нужно указать минимум 1 тег.'
             )
-        inrgedient_id_list = [item['id'] for item in data.get('ingredients')]
+        if 'ingredients' in data:
+            self.validate_ingredient_list(data['ingredients'])
+        return data
+
+    def validate_ingredient_list(self, ingredient_list):
+        inrgedient_id_list = [item['id'] for item in ingredient_list]
         unique_ingredient_id_list = set(inrgedient_id_list)
         if len(inrgedient_id_list) != len(unique_ingredient_id_list):
             raise serializers.ValidationError(
                 'Ингредиенты не должны повторяться.'
             )
-        return data
+        ingredients = Ingredient.objects.in_bulk(unique_ingredient_id_list)
+        missing = sorted(unique_ingredient_id_list - ingredients.keys())
+        if missing:
+            raise serializers.ValidationError({
+                'ingredients': [
+                    f'Ингредиент с id={pk} не существует.' for pk in missing
+                ]
+            })
+        for item in ingredient_list:
+            item['ingredient'] = ingredients[item['id']]
 
     def add_ingredients_and_tags(self, recipe, tags, ingredients):
         recipe.tags.set(tags)
         IngredientAmount.objects.bulk_create(
             [IngredientAmount(
                 recipe=recipe,
-                ingredient=Ingredient.objects.get(pk=ingredient['id']),
+                ingredient=ingredient['ingredient'],
                 amount=ingredient['amount']
             ) for ingredient in ingredients]
         )
 
+    @transaction.atomic()
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
@@ -140,19 +242,76 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             **validated_data
         )
         self.add_ingredients_and_tags(recipe, tags, ingredients)
+        change_user_stats(recipe.author_id, recipes_count=1)
+        add_recipe_to_feeds(recipe)
+        update_similar_recipes(recipe.id)
+        recipe_ingredient_index.invalidate(recipe.id)
         return recipe
 
+    def update_ingredients(self, recipe, ingredients):
+        """Применяет к рецепту только изменившиеся ингредиенты.
+
+        Возвращает True, если изменился сам набор ингредиентов.
+        """
+        existing = {
+            amount.ingredient_id: amount for amount in recipe.recipes.all()
+        }
+        old_amounts = {
+            ingredient_id: amount.amount
+            for ingredient_id, amount in existing.items()
+        }
+        new_amounts = {item['id']: item['amount'] for item in ingredients}
+        changed = []
+        for ingredient_id, amount in existing.items():
+            new_amount = new_amounts.get(ingredient_id)
+            if new_amount is not None and new_amount != amount.amount:
+                amount.amount = new_amount
+                changed.append(amount)
+        IngredientAmount.objects.bulk_update(changed, ['amount'])
+        IngredientAmount.objects.bulk_create(
+            [IngredientAmount(
+                recipe=recipe,
+                ingredient=item['ingredient'],
+                amount=item['amount']
+            ) for item in ingredients if item['id'] not in existing]
+        )
+        removed = existing.keys() - new_amounts.keys()
+        if removed:
+            IngredientAmount.objects.filter(
+                recipe=recipe,
+                ingredient_id__in=removed
+            ).delete()
+        change_recipe_in_cart_totals(recipe.id, old_amounts, new_amounts)
+        return existing.keys() != new_amounts.keys()
+
+    @transaction.atomic()
     def update(self, instance, validated_data):
-        ingredients = validated_data.pop('ingredients')
-        tags = validated_data.pop('tags')
-        IngredientAmount.objects.filter(
-            recipe=instance,
-            ingredient__in=instance.ingredients.all()).delete()
-        self.add_ingredients_and_tags(instance, tags, ingredients)
-        instance.save()
+        ingredients = validated_data.pop('ingredients', None)
+        tags = validated_data.pop('tags', None)
+        ingredients_changed = (
+            ingredients is not None
+            and self.update_ingredients(instance, ingredients)
+        )
+        tags_changed = tags is not None and (
+            {tag.id for tag in tags}
+            != {tag.id for tag in instance.tags.all()}
+        )
+        if tags_changed:
+            instance.tags.set(tags)
+        if ingredients_changed or tags_changed:
+            update_similar_recipes(instance.id)
+        if ingredients_changed:
+            recipe_ingredient_index.invalidate(instance.id)
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        if validated_data:
+            instance.save(update_fields=list(validated_data))
         return instance
 
     def to_representation(self, instance):
+        view = self.context.get('view')
+        if view is not None:
+            instance = view.get_queryset().get(pk=instance.pk)
         return RecipeReadSerializer(
             instance,
             context=self.context
@@ -160,12 +319,15 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 
 
 class RecipeAddingSerializer(serializers.ModelSerializer):
+    thumbnails = ThumbnailsField()
+
     class Meta:
         model = Recipe
         fields = [
             'id',
             'name',
             'image',
+            'thumbnails',
             'cooking_time'
         ]
         read_only_fields = [
@@ -176,7 +338,16 @@ class RecipeAddingSerializer(serializers.ModelSerializer):
         ]
 
 
-class FollowSerializer(GetIsSubscribedMixin, serializers.ModelSerializer):
+class CookableRecipeSerializer(RecipeAddingSerializer):
+    matched = serializers.IntegerField(read_only=True)
+    missing = serializers.IntegerField(read_only=True)
+
+    class Meta(RecipeAddingSerializer.Meta):
+        fields = RecipeAddingSerializer.Meta.fields + ['matched', 'missing']
+
+
+class FollowSerializer(TimedSerializerMixin, GetIsSubscribedMixin,
+                       serializers.ModelSerializer):
     id = serializers.ReadOnlyField(source='author.id')
     email = serializers.ReadOnlyField(source='author.email')
     username = serializers.ReadOnlyField(source='author.username')
@@ -184,7 +355,7 @@ class FollowSerializer(GetIsSubscribedMixin, serializers.ModelSerializer):
     last_name = serializers.ReadOnlyField(source='author.last_name')
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Follow
@@ -200,15 +371,8 @@ class FollowSerializer(GetIsSubscribedMixin, serializers.ModelSerializer):
         ]
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        queryset = obj.author.recipes.all()
-        if limit:
-            queryset = queryset[:int(limit)]
-        return RecipeAddingSerializer(queryset, many=True).data
-
-    def get_recipes_count(self, obj):
-        return obj.author.recipes.all().count()
+        recipes = self.context['recipes'].get(obj.author_id, [])
+        return RecipeAddingSerializer(recipes, many=True).data
 
 
 class CheckSubscribeSerializer(serializers.ModelSerializer):
@@ -241,63 +405,18 @@ class CheckSubscribeSerializer(serializers.ModelSerializer):
         return obj
 
 
-class CheckFavoriteSerializer(serializers.ModelSerializer):
-    user = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all()
-    )
-    recipe = serializers.PrimaryKeyRelatedField(
-        queryset=Recipe.objects.all()
-    )
-
-    class Meta:
-        model = FavoriteRecipe
-        fields = [
-            'user',
-            'recipe'
-        ]
-
-    def validate(self, obj):
-        user = self.context['request'].user
-        recipe = obj['recipe']
-        favorite = user.favorites.filter(recipe=recipe).exists()
-
-        if self.context.get('request').method == 'POST' and favorite:
-            raise serializers.ValidationError(
-                'Рецепт уже добавлен в избранное'
-            )
-        if self.context.get('request').method == 'DELETE' and not favorite:
-            raise serializers.ValidationError(
-                'Рецепта нет в избранном'
-            )
-        return obj
-
-
-class CheckShoppingCartSerializer(serializers.ModelSerializer):
-    user = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all()
-    )
-    recipe = serializers.PrimaryKeyRelatedField(
-        queryset=Recipe.objects.all()
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_LIMIT
     )
 
-    class Meta:
-        model = ShoppingCart
-        fields = [
-            'user',
-            'recipe'
-        ]
-
-    def validate(self, obj):
-        user = self.context['request'].user
-        recipe = obj['recipe']
-        cart = user.cart.filter(recipe=recipe).exists()
-
-        if self.context.get('request').method == 'POST' and cart:
-            raise serializers.ValidationError(
-                'Этот рецепт уже добавлен в список покупок'
-            )
-        if self.context.get('request').method == 'DELETE' and not cart:
-            raise serializers.ValidationError(
-                'Этот рецепт отсутствует в списке покупок'
-            )
-        return obj
+    def validate_recipes(self, value):
+        recipes = Recipe.objects.in_bulk(value)
+        missing = sorted(set(value) - recipes.keys())
+        if missing:
+            raise serializers.ValidationError([
+                f'Рецепт с id={pk} не существует.' for pk in missing
+            ])
+        return list(recipes.values())
@@ -0,0 +1,122 @@
+import base64
+import io
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Tag
+
+User = get_user_model()
+
+PASSWORD = 'test-Password-123'
+PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwAD'
+    'hgGAWjR9awAAAABJRU5ErkJggg=='
+)
+IMAGE = 'data:image/png;base64,' + base64.b64encode(PNG).decode()
+MEDIA_ROOT = tempfile.mkdtemp()
+# Тесты очищают кеш: общий кеш работающего приложения трогать нельзя.
+CACHE_DIR = tempfile.mkdtemp()
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+    }
+}
+
+
+def call_command_quietly(name, *args, **options):
+    """call_command для команд, которые печатают результат через print."""
+    with redirect_stdout(io.StringIO()) as output:
+        call_command(name, *args, **options)
+    return output.getvalue()
+
+
+class APITestMixin:
+    """Пользователи, теги и ингредиенты для тестов API."""
+
+    @classmethod
+    def create_fixtures(cls):
+        cls.users = [
+            User.objects.create_user(
+                username=f'user{number}',
+                email=f'user{number}@example.com',
+                first_name='Имя',
+                last_name='Фамилия',
+                password=PASSWORD
+            ) for number in range(5)
+        ]
+        cls.tags = [
+            Tag.objects.create(
+                name=f'Тег {number}',
+                color=f'#00000{number}',
+                slug=f'tag{number}'
+            ) for number in range(3)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {number}', measurement_unit='г'
+            ) for number in range(10)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_client(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client
+
+    def create_recipe(self, author, ingredients=(0, 1, 2), tags=(0, 1),
+                      name='Рецепт'):
+        response = self.get_client(author).post('/api/recipes/', {
+            'name': name,
+            'text': 'Описание',
+            'cooking_time': 5,
+            'image': IMAGE,
+            'tags': [self.tags[number].id for number in tags],
+            'ingredients': [
+                {'id': self.ingredients[number].id, 'amount': 1}
+                for number in ingredients
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['id']
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CACHES=CACHES)
+class APITestCase(APITestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_fixtures()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CACHES=CACHES)
+class APITransactionTestCase(APITestMixin, TransactionTestCase):
+    """Для кода, который выполняется после фиксации транзакции.
+
+    Уменьшенные копии картинок не строятся: фоновый поток пережил бы тест.
+    """
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch('recipes.signals.schedule_thumbnails')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.create_fixtures()
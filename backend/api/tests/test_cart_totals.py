@@ -0,0 +1,44 @@
+from recipes.models import Recipe, ShoppingCart
+from users.models import UserStats
+from .base import APITestCase, User, call_command_quietly
+
+
+class CartTotalsTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.users[1]
+        self.kept = self.create_recipe(self.author, ingredients=(0, 1))
+        self.deleted = self.create_recipe(self.author, ingredients=(1, 2))
+        for user in (self.users[0], self.users[2]):
+            client = self.get_client(user)
+            for recipe_id in (self.kept, self.deleted):
+                response = client.post(
+                    f'/api/recipes/{recipe_id}/shopping_cart/'
+                )
+                self.assertEqual(response.status_code, 201)
+
+    def assert_totals_match(self):
+        call_command_quietly('rebuild_cart_totals', '--verify')
+
+    def test_api_delete(self):
+        response = self.get_client(self.author).delete(
+            f'/api/recipes/{self.deleted}/'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assert_totals_match()
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).recipes_count, 1
+        )
+
+    def test_orm_delete(self):
+        Recipe.objects.get(pk=self.deleted).delete()
+        self.assert_totals_match()
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).recipes_count, 1
+        )
+
+    def test_author_delete(self):
+        User.objects.get(pk=self.author.pk).delete()
+        self.assertFalse(ShoppingCart.objects.exists())
+        self.assert_totals_match()
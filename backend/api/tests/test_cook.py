@@ -0,0 +1,125 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import override_settings
+
+from recipes.models import IngredientAmount
+from recipes.search import recipe_ingredient_index
+from recipes.versions import get_version
+from .base import APITransactionTestCase
+
+
+class CookSearchTest(APITransactionTestCase):
+
+    def search(self, *numbers):
+        ids = ','.join(str(self.ingredients[number].id) for number in numbers)
+        response = self.get_client().get(
+            f'/api/recipes/cook/?ingredients={ids}'
+        )
+        return [
+            (recipe['id'], recipe['matched'], recipe['missing'])
+            for recipe in response.json()
+        ]
+
+    def test_cook(self):
+        author = self.users[0]
+        first = self.create_recipe(author, ingredients=(0, 1))
+        second = self.create_recipe(author, ingredients=(0, 1, 2, 3))
+        self.create_recipe(author, ingredients=(4, 5))
+        fourth = self.create_recipe(author, ingredients=(0, 6, 7))
+        self.assertEqual(
+            self.search(0, 1, 2),
+            [(first, 2, 0), (second, 3, 1), (fourth, 1, 2)]
+        )
+
+        self.get_client(author).patch(f'/api/recipes/{fourth}/', {
+            'ingredients': [{'id': self.ingredients[0].id, 'amount': 1}],
+        }, format='json')
+        self.assertEqual(
+            self.search(0, 1, 2)[:2], [(first, 2, 0), (fourth, 1, 0)]
+        )
+
+        self.get_client(author).delete(f'/api/recipes/{first}/')
+        self.assertNotIn(
+            first, [recipe_id for recipe_id, _, _ in self.search(0, 1, 2)]
+        )
+
+    def test_repeated_parameter(self):
+        recipe_id = self.create_recipe(self.users[0], ingredients=(4, 5))
+        response = self.get_client().get(
+            '/api/recipes/cook/?ingredients={}&ingredients={}'.format(
+                self.ingredients[4].id, self.ingredients[5].id
+            )
+        )
+        self.assertEqual(response.json()[0]['id'], recipe_id)
+
+    def test_empty_and_invalid(self):
+        client = self.get_client()
+        self.assertEqual(client.get('/api/recipes/cook/').json(), [])
+        response = client.get('/api/recipes/cook/?ingredients=x')
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalidated_after_commit(self):
+        version = get_version(IngredientAmount)
+        with transaction.atomic():
+            recipe_id = self.create_recipe(self.users[0])
+            self.assertEqual(get_version(IngredientAmount), version)
+        self.assertNotEqual(get_version(IngredientAmount), version)
+        version = get_version(IngredientAmount)
+        with transaction.atomic():
+            self.get_client(self.users[0]).delete(
+                f'/api/recipes/{recipe_id}/'
+            )
+            self.assertEqual(get_version(IngredientAmount), version)
+        self.assertNotEqual(get_version(IngredientAmount), version)
+
+    def watch_builds(self):
+        return mock.patch.object(
+            recipe_ingredient_index,
+            '_build',
+            wraps=recipe_ingredient_index._build
+        )
+
+    def test_updated_without_rebuild(self):
+        author = self.users[0]
+        first = self.create_recipe(author, ingredients=(0, 1))
+        self.search(0)
+        with self.watch_builds() as build:
+            second = self.create_recipe(author, ingredients=(0, 2))
+            self.assertEqual(
+                self.search(0, 2), [(second, 2, 0), (first, 1, 1)]
+            )
+            self.get_client(author).patch(f'/api/recipes/{first}/', {
+                'ingredients': [
+                    {'id': self.ingredients[number].id, 'amount': 1}
+                    for number in (0, 2, 3)
+                ],
+            }, format='json')
+            self.assertEqual(
+                self.search(0, 2), [(second, 2, 0), (first, 2, 1)]
+            )
+            self.get_client(author).delete(f'/api/recipes/{second}/')
+            self.assertEqual(self.search(0, 2), [(first, 2, 1)])
+        build.assert_not_called()
+
+    @override_settings(COOK_INDEX_OVERLAY_LIMIT=1)
+    def test_rebuilt_when_overlay_grows(self):
+        author = self.users[0]
+        self.search(0)
+        with self.watch_builds() as build:
+            first = self.create_recipe(author, ingredients=(0,))
+            self.assertEqual(self.search(0), [(first, 1, 0)])
+            build.assert_not_called()
+            second = self.create_recipe(author, ingredients=(0, 1))
+            self.assertEqual(self.search(0), [(first, 1, 0), (second, 1, 1)])
+            build.assert_called_once()
+
+    def test_reset(self):
+        recipe_id = self.create_recipe(self.users[0], ingredients=(0,))
+        self.search(0)
+        IngredientAmount.objects.create(
+            recipe_id=recipe_id, ingredient=self.ingredients[1], amount=1
+        )
+        self.assertEqual(self.search(0, 1), [(recipe_id, 1, 0)])
+        recipe_ingredient_index.reset()
+        self.assertEqual(self.search(0, 1), [(recipe_id, 2, 0)])
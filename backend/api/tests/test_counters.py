@@ -0,0 +1,97 @@
+from recipes.models import FavoriteRecipe, Recipe
+from users.models import UserStats
+from .base import APITestCase, call_command_quietly
+
+
+class CountersTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.users[0]
+        self.recipe_ids = [
+            self.create_recipe(self.author, ingredients=(number,))
+            for number in range(3)
+        ]
+
+    def get_counters(self, field):
+        return list(Recipe.objects.filter(
+            pk__in=self.recipe_ids
+        ).order_by('pk').values_list(field, flat=True))
+
+    def get_stats(self, user):
+        stats = UserStats.objects.get(user=user)
+        return stats.recipes_count, stats.followers_count
+
+    def test_single_endpoints(self):
+        recipe_id = self.recipe_ids[0]
+        for path, field in (
+            ('favorite', 'favorites_count'),
+            ('shopping_cart', 'in_carts_count'),
+        ):
+            with self.subTest(path=path):
+                url = f'/api/recipes/{recipe_id}/{path}/'
+                for user in self.users[1:3]:
+                    client = self.get_client(user)
+                    self.assertEqual(client.post(url).status_code, 201)
+                self.assertEqual(client.post(url).status_code, 400)
+                self.assertEqual(self.get_counters(field), [2, 0, 0])
+                self.assertEqual(client.delete(url).status_code, 204)
+                self.assertEqual(client.delete(url).status_code, 400)
+                self.assertEqual(self.get_counters(field), [1, 0, 0])
+
+    def test_favorite_bulk(self):
+        client = self.get_client(self.users[1])
+        client.post(f'/api/recipes/{self.recipe_ids[0]}/favorite/')
+        response = client.post(
+            '/api/recipes/favorite_bulk/',
+            {'recipes': self.recipe_ids},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.get_counters('favorites_count'), [1, 1, 1])
+        response = client.delete(
+            '/api/recipes/favorite_bulk/',
+            {'recipes': self.recipe_ids[1:]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_counters('favorites_count'), [1, 0, 0])
+
+    def test_user_stats(self):
+        self.assertEqual(self.get_stats(self.author), (3, 0))
+        url = f'/api/users/{self.author.id}/subscribe/'
+        for user in self.users[1:3]:
+            self.assertEqual(
+                self.get_client(user).post(url).status_code, 201
+            )
+        self.assertEqual(self.get_stats(self.author), (3, 2))
+        self.assertEqual(
+            self.get_client(self.users[1]).delete(url).status_code, 204
+        )
+        response = self.get_client(self.author).delete(
+            f'/api/recipes/{self.recipe_ids[0]}/'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_stats(self.author), (2, 1))
+
+    def test_recount_counters(self):
+        FavoriteRecipe.objects.create(
+            user=self.users[1], recipe_id=self.recipe_ids[0]
+        )
+        Recipe.objects.filter(pk__in=self.recipe_ids[1:]).update(
+            in_carts_count=5
+        )
+        UserStats.objects.filter(user=self.author).update(followers_count=4)
+        UserStats.objects.filter(user=self.users[1]).delete()
+
+        output = call_command_quietly('recount_counters')
+        self.assertIn('Исправлено рецептов: 3.', output)
+        self.assertIn('Исправлено пользователей: 1.', output)
+        self.assertEqual(self.get_counters('favorites_count'), [1, 0, 0])
+        self.assertEqual(self.get_counters('in_carts_count'), [0, 0, 0])
+        self.assertEqual(self.get_stats(self.author), (3, 0))
+        self.assertEqual(self.get_stats(self.users[1]), (0, 0))
+
+        output = call_command_quietly('recount_counters')
+        self.assertIn('Исправлено рецептов: 0.', output)
+        self.assertIn('Исправлено пользователей: 0.', output)
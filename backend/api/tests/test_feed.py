@@ -0,0 +1,57 @@
+from recipes.models import FeedEntry
+from .base import APITestCase, call_command_quietly
+
+
+class FeedTest(APITestCase):
+
+    def get_ids(self, response):
+        return [recipe['id'] for recipe in response.json()['results']]
+
+    def test_feed(self):
+        first, second, reader = self.users[:3]
+        client = self.get_client(reader)
+        first_ids = [self.create_recipe(first) for _ in range(3)]
+        self.assertEqual(self.get_ids(client.get('/api/recipes/feed/')), [])
+        response = client.post(f'/api/users/{first.id}/subscribe/')
+        self.assertEqual(response.status_code, 201)
+        second_ids = [self.create_recipe(second) for _ in range(2)]
+        client.post(f'/api/users/{second.id}/subscribe/')
+        first_ids.append(self.create_recipe(first))
+        expected = sorted(first_ids + second_ids, reverse=True)
+
+        response = client.get('/api/recipes/feed/?limit=4&count=true')
+        data = response.json()
+        self.assertEqual(self.get_ids(response), expected[:4])
+        self.assertEqual(data['count'], 6)
+        self.assertTrue(data['results'][0]['author']['is_subscribed'])
+        response = client.get(data['next'])
+        self.assertEqual(self.get_ids(response), expected[4:])
+        self.assertIsNone(response.json()['next'])
+
+        client.delete(f'/api/users/{first.id}/subscribe/')
+        self.assertEqual(
+            self.get_ids(client.get('/api/recipes/feed/')),
+            sorted(second_ids, reverse=True)
+        )
+        self.get_client(second).delete(f'/api/recipes/{second_ids[0]}/')
+        self.assertEqual(FeedEntry.objects.count(), 1)
+
+    def test_rebuild_matches_incremental(self):
+        author, reader = self.users[:2]
+        self.get_client(reader).post(f'/api/users/{author.id}/subscribe/')
+        for _ in range(3):
+            self.create_recipe(author)
+        entries = set(FeedEntry.objects.values_list('user', 'recipe'))
+        call_command_quietly('rebuild_feeds')
+        self.assertEqual(
+            entries, set(FeedEntry.objects.values_list('user', 'recipe'))
+        )
+
+    def test_own_recipes_not_in_feed(self):
+        self.create_recipe(self.users[0])
+        response = self.get_client(self.users[0]).get('/api/recipes/feed/')
+        self.assertEqual(self.get_ids(response), [])
+
+    def test_anonymous(self):
+        response = self.get_client().get('/api/recipes/feed/')
+        self.assertEqual(response.status_code, 401)
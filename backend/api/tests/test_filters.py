@@ -0,0 +1,73 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .base import APITestCase
+
+FILTERED_PATH = '/api/recipes/?tags=tag0&tags=tag1&author={}&cursor='
+
+
+class RecipeFilterTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.users[0]
+        self.both = self.create_recipe(self.author, tags=(0, 1))
+        self.second = self.create_recipe(self.author, tags=(1,))
+        self.third = self.create_recipe(self.author, tags=(2,))
+        self.other = self.create_recipe(self.users[1], tags=(0,))
+
+    def get_ids(self, path):
+        response = self.get_client().get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [recipe['id'] for recipe in response.json()['results']]
+
+    def test_tags(self):
+        self.assertEqual(
+            self.get_ids('/api/recipes/?tags=tag0&tags=tag1'),
+            [self.other, self.second, self.both]
+        )
+        self.assertEqual(
+            self.get_ids('/api/recipes/?tags=tag2&tags=unknown'),
+            [self.third]
+        )
+        self.assertEqual(self.get_ids('/api/recipes/?tags=unknown'), [])
+
+    def test_author(self):
+        self.assertEqual(
+            self.get_ids(f'/api/recipes/?author={self.users[1].id}'),
+            [self.other]
+        )
+        self.assertEqual(
+            self.get_ids(
+                f'/api/recipes/?author={self.users[1].id}'
+                f'&author={self.author.id}&tags=tag0'
+            ),
+            [self.other, self.both]
+        )
+        response = self.get_client().get('/api/recipes/?author=0')
+        self.assertEqual(response.status_code, 400)
+
+    def capture(self):
+        with CaptureQueriesContext(connection) as context:
+            self.get_ids(FILTERED_PATH.format(self.author.id))
+        return [query['sql'] for query in context.captured_queries]
+
+    def test_queries_do_not_grow(self):
+        queries = self.capture()
+        for _ in range(5):
+            self.create_recipe(self.author, tags=(0, 1))
+        self.assertEqual(len(self.capture()), len(queries))
+        for sql in queries:
+            self.assertNotIn('DISTINCT', sql)
+
+    @skipUnless(connection.vendor == 'sqlite', 'План запроса SQLite.')
+    def test_no_sort_over_table(self):
+        """Страница читается по индексу без сортировки и DISTINCT."""
+        sql = next(sql for sql in self.capture() if 'has_tags' in sql)
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertIn('USING INDEX recipe_', plan[0])
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan))
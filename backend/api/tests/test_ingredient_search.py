@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from recipes.models import Ingredient
+from recipes.search import ingredient_index
+from .base import APITransactionTestCase
+
+NAMES = (
+    'Безсахарный джем',
+    'Кокосовый сахар',
+    'Соль',
+    'Сахарная пудра',
+    'Ванильный сахар',
+    'Сахар',
+)
+
+
+class IngredientSearchTest(APITransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for name in NAMES:
+            Ingredient.objects.create(name=name, measurement_unit='г')
+
+    def search(self, name):
+        response = self.get_client().get('/api/ingredients/', {'name': name})
+        self.assertEqual(response.status_code, 200)
+        return [ingredient['name'] for ingredient in response.json()]
+
+    def test_ranking(self):
+        self.assertEqual(self.search('САХ'), [
+            'Сахар',
+            'Сахарная пудра',
+            'Ванильный сахар',
+            'Кокосовый сахар',
+            'Безсахарный джем',
+        ])
+        self.assertEqual(self.search('со')[:2], ['Соль', 'Кокосовый сахар'])
+        self.assertEqual(self.search('  '), [])
+
+    @override_settings(INGREDIENT_SEARCH_LIMIT=3)
+    def test_limit(self):
+        self.assertEqual(
+            self.search('сах'),
+            ['Сахар', 'Сахарная пудра', 'Ванильный сахар']
+        )
+        self.assertEqual(len(self.search('ингредиент')), 3)
+
+    def test_rebuilt_after_change(self):
+        self.assertEqual(self.search('мёд'), [])
+        with mock.patch.object(
+            ingredient_index, '_build', wraps=ingredient_index._build
+        ) as build:
+            self.search('сах')
+            build.assert_not_called()
+            honey = Ingredient.objects.create(
+                name='Мёд', measurement_unit='г'
+            )
+            self.assertEqual(self.search('мёд'), ['Мёд'])
+            honey.delete()
+            self.assertEqual(self.search('мёд'), [])
+        self.assertEqual(build.call_count, 2)
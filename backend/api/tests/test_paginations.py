@@ -0,0 +1,41 @@
+import json
+from base64 import urlsafe_b64encode
+
+from .base import APITestCase
+
+
+def encode_cursor(values):
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+class KeysetPaginationTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.recipe_ids = [
+            self.create_recipe(self.users[0]) for _ in range(5)
+        ]
+
+    def get_ids(self, response):
+        return [recipe['id'] for recipe in response.json()['results']]
+
+    def test_pages(self):
+        client = self.get_client()
+        response = client.get('/api/recipes/?cursor=&limit=3')
+        expected = sorted(self.recipe_ids, reverse=True)
+        self.assertEqual(self.get_ids(response), expected[:3])
+        response = client.get(response.json()['next'])
+        self.assertEqual(self.get_ids(response), expected[3:])
+        self.assertIsNone(response.json()['next'])
+
+    def test_invalid_cursor(self):
+        client = self.get_client(self.users[1])
+        for cursor in (
+            'not base64!', encode_cursor('x'), encode_cursor(['x']),
+            encode_cursor(['abc', 'x']), encode_cursor([{}, []]),
+            encode_cursor([None, 1]),
+        ):
+            for path in ('/api/recipes/', '/api/recipes/feed/'):
+                with self.subTest(cursor=cursor, path=path):
+                    response = client.get(path, {'cursor': cursor})
+                    self.assertEqual(response.status_code, 404)
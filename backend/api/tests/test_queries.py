@@ -0,0 +1,54 @@
+from recipes.models import FavoriteRecipe, ShoppingCart
+from users.models import Follow
+from .base import APITestCase
+
+# Подсчёт для пагинации, страница, авторы с is_subscribed, теги и
+# ингредиенты с количествами; у детального просмотра нет подсчёта.
+LIST_QUERIES = 5
+ANONYMOUS_LIST_QUERIES = 5
+DETAIL_QUERIES = 4
+
+
+class RecipeQueryCountTest(APITestCase):
+    """Число запросов чтения рецептов не зависит от размера страницы."""
+
+    def setUp(self):
+        super().setUp()
+        self.reader = self.users[4]
+        for number in range(8):
+            recipe_id = self.create_recipe(
+                self.users[number % 4],
+                ingredients=range(number % 5 + 1),
+                tags=range(number % 3 + 1)
+            )
+            if number % 2:
+                FavoriteRecipe.objects.create(
+                    user=self.reader, recipe_id=recipe_id
+                )
+                ShoppingCart.objects.create(
+                    user=self.reader, recipe_id=recipe_id
+                )
+        Follow.objects.create(user=self.reader, author=self.users[0])
+
+    def test_list(self):
+        client = self.get_client(self.reader)
+        for limit in (2, 8):
+            with self.assertNumQueries(LIST_QUERIES):
+                response = client.get(f'/api/recipes/?limit={limit}')
+            self.assertEqual(len(response.json()['results']), limit)
+
+    def test_list_anonymous(self):
+        client = self.get_client()
+        for limit in (2, 8):
+            with self.assertNumQueries(ANONYMOUS_LIST_QUERIES):
+                response = client.get(f'/api/recipes/?limit={limit}')
+            self.assertEqual(len(response.json()['results']), limit)
+
+    def test_detail(self):
+        client = self.get_client(self.reader)
+        small = self.create_recipe(self.users[0], ingredients=(0,))
+        large = self.create_recipe(self.users[0], ingredients=range(10))
+        for recipe_id in (small, large):
+            with self.assertNumQueries(DETAIL_QUERIES):
+                response = client.get(f'/api/recipes/{recipe_id}/')
+            self.assertEqual(response.status_code, 200)
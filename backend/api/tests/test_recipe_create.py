@@ -0,0 +1,52 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Ingredient, Recipe
+from .base import IMAGE, APITestCase
+
+
+class RecipeCreateTest(APITestCase):
+
+    def post(self, ingredient_ids):
+        return self.get_client(self.users[0]).post('/api/recipes/', {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 5,
+            'image': IMAGE,
+            'tags': [self.tags[0].id],
+            'ingredients': [
+                {'id': pk, 'amount': 1} for pk in ingredient_ids
+            ],
+        }, format='json')
+
+    def test_unknown_ingredient(self):
+        missing = Ingredient.objects.order_by('-id')[0].id + 1
+        response = self.post([self.ingredients[0].id, missing, missing + 1])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'ingredients': [
+            f'Ингредиент с id={missing} не существует.',
+            f'Ингредиент с id={missing + 1} не существует.',
+        ]})
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_repeated_ingredient(self):
+        pk = self.ingredients[0].id
+        response = self.post([pk, pk])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_constant_queries(self):
+        # У обоих новых рецептов будут похожие: иначе у первого на один
+        # INSERT меньше.
+        self.create_recipe(self.users[1], ingredients=range(10), tags=(0,))
+        counts = []
+        for ingredients in (self.ingredients[:1], self.ingredients):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post([item.id for item in ingredients])
+            self.assertEqual(response.status_code, 201, response.content)
+            self.assertEqual(
+                [item['id'] for item in response.json()['ingredients']],
+                [item.id for item in ingredients]
+            )
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
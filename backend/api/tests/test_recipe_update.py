@@ -0,0 +1,82 @@
+from unittest import mock
+
+from recipes.models import IngredientAmount, ShoppingCartTotal
+from .base import APITestCase, call_command_quietly
+
+
+class RecipeUpdateTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.users[0]
+        self.buyer = self.users[1]
+        self.recipe = self.create_recipe(self.author, ingredients=(0, 1, 2))
+        self.get_client(self.buyer).post(
+            f'/api/recipes/{self.recipe}/shopping_cart/'
+        )
+        self.amount_ids = self.get_amount_ids()
+
+    def get_amount_ids(self):
+        return dict(IngredientAmount.objects.filter(
+            recipe_id=self.recipe
+        ).values_list('ingredient_id', 'id'))
+
+    def get_totals(self):
+        return dict(ShoppingCartTotal.objects.filter(
+            user=self.buyer
+        ).values_list('ingredient_id', 'amount'))
+
+    def patch(self, data):
+        with mock.patch('api.serializers.update_similar_recipes') as similar:
+            response = self.get_client(self.author).patch(
+                f'/api/recipes/{self.recipe}/', data, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        call_command_quietly('rebuild_cart_totals', '--verify')
+        return similar
+
+    def patch_ingredients(self, amounts):
+        return self.patch({'ingredients': [
+            {'id': self.ingredients[number].id, 'amount': amount}
+            for number, amount in amounts.items()
+        ]})
+
+    def test_amount_change(self):
+        similar = self.patch_ingredients({0: 5, 1: 1, 2: 1})
+        self.assertEqual(self.get_amount_ids(), self.amount_ids)
+        self.assertEqual(self.get_totals()[self.ingredients[0].id], 5)
+        similar.assert_not_called()
+
+    def test_add(self):
+        similar = self.patch_ingredients({0: 1, 1: 1, 2: 1, 3: 4})
+        amount_ids = self.get_amount_ids()
+        new_id = self.ingredients[3].id
+        self.assertIn(new_id, amount_ids)
+        del amount_ids[new_id]
+        self.assertEqual(amount_ids, self.amount_ids)
+        self.assertEqual(self.get_totals()[new_id], 4)
+        similar.assert_called_once_with(self.recipe)
+
+    def test_remove(self):
+        similar = self.patch_ingredients({0: 1, 1: 1})
+        removed_id = self.ingredients[2].id
+        del self.amount_ids[removed_id]
+        self.assertEqual(self.get_amount_ids(), self.amount_ids)
+        self.assertNotIn(removed_id, self.get_totals())
+        similar.assert_called_once_with(self.recipe)
+
+    def test_patch_without_ingredients(self):
+        totals = self.get_totals()
+        similar = self.patch({'name': 'Новое название'})
+        self.assertEqual(self.get_amount_ids(), self.amount_ids)
+        self.assertEqual(self.get_totals(), totals)
+        similar.assert_not_called()
+
+    def test_tags(self):
+        similar = self.patch({
+            'name': 'Новое название',
+            'tags': [self.tags[1].id, self.tags[0].id],
+        })
+        similar.assert_not_called()
+        similar = self.patch({'tags': [self.tags[2].id]})
+        similar.assert_called_once_with(self.recipe)
@@ -0,0 +1,40 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.test import SimpleTestCase, override_settings
+
+from recipes.models import Tag
+from recipes.versions import check_shared_cache, get_version
+from .base import APITransactionTestCase
+
+
+class ReferenceCacheTest(APITransactionTestCase):
+
+    def test_conditional_get(self):
+        client = self.get_client()
+        etag = client.get('/api/tags/')['ETag']
+        response = client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Tag.objects.create(name='Новый', color='#ffffff', slug='new')
+        response = client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), len(self.tags) + 1)
+
+    def test_version_changes_after_commit(self):
+        version = get_version(Tag)
+        with transaction.atomic():
+            Tag.objects.create(name='Новый', color='#ffffff', slug='new')
+            self.assertEqual(get_version(Tag), version)
+        self.assertNotEqual(get_version(Tag), version)
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }})
+    def test_process_local_cache_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            check_shared_cache()
+
+    def test_default_cache_is_shared(self):
+        check_shared_cache()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import skipUnless
+
+from django.db import connection, connections
+from django.test import override_settings
+
+from foodgram.db.routers import replica_reads
+from recipes.models import FavoriteRecipe, Recipe
+from .base import APITestCase, APITransactionTestCase
+
+
+class ReplicaReadsTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.create_recipe(self.users[0])
+        self.client = self.get_client(self.users[1])
+
+    def get_replica_reads(self, method, path):
+        """Значения replica_reads во время запросов к базе."""
+        values = []
+
+        def record(execute, sql, params, many, context):
+            values.append(replica_reads.get())
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            getattr(self.client, method)(path)
+        return values
+
+    def test_safe_request_reads_from_replica(self):
+        values = self.get_replica_reads('get', '/api/recipes/')
+        self.assertTrue(values)
+        self.assertTrue(all(values))
+        self.assertFalse(replica_reads.get())
+
+    def test_write_pins_to_primary(self):
+        path = f'/api/recipes/{self.recipe}/favorite/'
+        self.assertFalse(any(self.get_replica_reads('post', path)))
+        self.assertFalse(any(self.get_replica_reads('get', '/api/recipes/')))
+
+    def test_failed_write_does_not_pin(self):
+        self.get_replica_reads('post', '/api/recipes/0/favorite/')
+        values = self.get_replica_reads('get', '/api/recipes/')
+        self.assertTrue(all(values))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Реплика — копия файла SQLite.')
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReplicaRoutingTest(APITransactionTestCase):
+    """Чтения через вторую базу SQLite, отстающую от основной."""
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.create_recipe(self.users[0], name='Старое')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        name = os.path.join(directory, 'replica.sqlite3')
+        connection.ensure_connection()
+        replica = sqlite3.connect(name)
+        connection.connection.backup(replica)
+        replica.close()
+        connections.databases['replica1'] = {
+            **connections.databases['default'], 'NAME': name
+        }
+        self.addCleanup(self.remove_replica)
+        Recipe.objects.filter(pk=self.recipe).update(name='Новое')
+
+    def remove_replica(self):
+        connections['replica1'].close()
+        del connections.databases['replica1']
+        delattr(connections._connections, 'replica1')
+
+    def get_name(self, client):
+        response = client.get(f'/api/recipes/{self.recipe}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['name']
+
+    def test_unpinned_read_hits_replica(self):
+        self.assertEqual(self.get_name(self.get_client()), 'Старое')
+        self.assertEqual(
+            self.get_name(self.get_client(self.users[1])), 'Старое'
+        )
+
+    def test_writer_reads_from_primary(self):
+        client = self.get_client(self.users[1])
+        response = client.post(f'/api/recipes/{self.recipe}/favorite/')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(FavoriteRecipe.objects.filter(
+            user=self.users[1], recipe_id=self.recipe
+        ).exists())
+        self.assertEqual(self.get_name(client), 'Новое')
+        self.assertEqual(
+            self.get_name(self.get_client(self.users[2])), 'Старое'
+        )
+
+    def test_failed_write_does_not_pin(self):
+        client = self.get_client(self.users[1])
+        response = client.post('/api/recipes/0/favorite/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.get_name(client), 'Старое')
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from recipes.fulltext import search_recipes
+from recipes.models import Recipe
+from .base import APITestCase
+
+
+class RecipeSearchTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        author = self.users[0]
+        self.borscht = self.create_recipe(author, name='Борщ украинский')
+        self.salad = self.create_recipe(author, name='Салат', tags=(1,))
+        self.get_client(author).patch(
+            f'/api/recipes/{self.salad}/',
+            {'text': 'Как холодный борщ, но со свёклой'},
+            format='json'
+        )
+        self.olivier = self.create_recipe(author, name='Оливье')
+
+    def search(self, query, **params):
+        response = self.get_client().get(
+            '/api/recipes/', {'search': query, **params}
+        )
+        return [recipe['id'] for recipe in response.json()['results']]
+
+    def test_name_ranked_above_text(self):
+        self.assertEqual(self.search('борщ'), [self.borscht, self.salad])
+
+    def test_prefix_and_several_words(self):
+        self.assertEqual(self.search('бор'), [self.borscht, self.salad])
+        self.assertEqual(self.search('салат холод'), [self.salad])
+
+    def test_combined_with_filters(self):
+        self.assertEqual(self.search('борщ', tags='tag0'), [self.borscht])
+
+    def test_special_characters(self):
+        self.assertEqual(len(self.search('"*)(')), 3)
+
+    def test_deleted_recipe_not_found(self):
+        self.get_client(self.users[0]).delete(f'/api/recipes/{self.olivier}/')
+        self.assertEqual(self.search('оливье'), [])
+
+    def test_match_is_annotation(self):
+        queryset = search_recipes(Recipe.objects.all(), 'борщ')
+        self.assertFalse(queryset.query.extra)
+        self.assertIn('search_match', queryset.query.annotations)
+
+    def test_cursor_keeps_rank_order(self):
+        self.assertEqual(
+            self.search('борщ', cursor=''), [self.borscht, self.salad]
+        )
+        response = self.get_client().get('/api/recipes/', {'cursor': ''})
+        self.assertNotIn('count', response.json())
+
+    def test_postgresql_prefix_query(self):
+        with mock.patch('recipes.fulltext.connection') as connection:
+            connection.vendor = 'postgresql'
+            queryset = search_recipes(Recipe.objects.all(), 'борщ укр.')
+        match = queryset.query.annotations['search_match']
+        self.assertIn('to_tsquery', match.sql)
+        self.assertEqual(match.params[1], 'борщ:* & укр:*')
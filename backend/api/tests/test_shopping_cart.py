@@ -0,0 +1,94 @@
+import csv
+import io
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+
+from api.utils import chunked
+from foodgram.db.routers import get_pin_cache_key, replica_reads
+from foodgram.settings import SHOPPING_CART, SHOPPING_CART_CSV
+from .base import APITestCase
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+class ShoppingCartExportTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.users[1]
+        for ingredients in ((0, 1), (1, 2)):
+            recipe_id = self.create_recipe(
+                self.users[0], ingredients=ingredients
+            )
+            self.get_client(self.user).post(
+                f'/api/recipes/{recipe_id}/shopping_cart/'
+            )
+        cache.delete(get_pin_cache_key(self.user.pk))
+
+    def download(self, user, **params):
+        response = self.get_client(user).get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_text(self):
+        response, content = self.download(self.user)
+        self.assertEqual(
+            response['Content-Type'], 'text/plain; charset=utf-8'
+        )
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename=shopping_cart.txt'
+        )
+        self.assertEqual(content, SHOPPING_CART + (
+            'Ингредиент 0 - 1/г \n'
+            'Ингредиент 1 - 2/г \n'
+            'Ингредиент 2 - 1/г \n'
+        ))
+
+    def test_csv(self):
+        response, content = self.download(self.user, type='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename=shopping_cart.csv'
+        )
+        self.assertEqual(list(csv.reader(io.StringIO(content))), [
+            SHOPPING_CART_CSV,
+            ['Ингредиент 0', '1', 'г'],
+            ['Ингредиент 1', '2', 'г'],
+            ['Ингредиент 2', '1', 'г'],
+        ])
+
+    def test_empty_and_anonymous(self):
+        self.assertEqual(self.download(self.users[2])[1], SHOPPING_CART)
+        self.assertEqual(self.get_client().get(URL).status_code, 401)
+
+    def test_chunked(self):
+        self.assertEqual(
+            list(chunked(iter(['a', 'b', 'c', 'd', 'e']), 2)),
+            ['ab', 'cd', 'e']
+        )
+
+    def test_read_inside_view(self):
+        replica = []
+
+        def record(execute, sql, params, many, context):
+            if 'recipes_shoppingcarttotal' in sql:
+                replica.append(replica_reads.get())
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = self.get_client(self.user).get(URL)
+            self.assertEqual(replica, [True])
+            b''.join(response.streaming_content)
+        self.assertEqual(replica, [True])
+
+    @override_settings(SERVER_TIMING=True, SERVER_TIMING_LOG_SAMPLE_RATE=0)
+    def test_server_timing_counts_export(self):
+        response = self.get_client(self.user).get(URL)
+        queries = re.search(r'desc="(\d+) queries"', response['Server-Timing'])
+        self.assertGreater(int(queries.group(1)), 0)
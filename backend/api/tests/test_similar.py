@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from recipes.models import SimilarRecipe
+from .base import APITestCase, call_command_quietly
+
+
+class SimilarRecipesTest(APITestCase):
+
+    def get_similar(self, recipe_id):
+        response = self.get_client().get(f'/api/recipes/{recipe_id}/similar/')
+        return [recipe['id'] for recipe in response.json()]
+
+    def get_scores(self):
+        return sorted(
+            (recipe_id, similar_id, round(score, 6))
+            for recipe_id, similar_id, score in
+            SimilarRecipe.objects.values_list('recipe', 'similar', 'score')
+        )
+
+    def assert_matches_rebuild(self):
+        scores = self.get_scores()
+        call_command_quietly('build_similar_recipes')
+        self.assertEqual(scores, self.get_scores())
+
+    def test_similar(self):
+        author = self.users[0]
+        first = self.create_recipe(author, ingredients=(0, 1, 2), tags=(0,))
+        second = self.create_recipe(author, ingredients=(0, 1, 3), tags=(0,))
+        third = self.create_recipe(author, ingredients=(0, 5, 6), tags=(1,))
+        unrelated = self.create_recipe(author, ingredients=(7, 8))
+        self.assertEqual(self.get_similar(first), [second, third])
+        self.assertEqual(self.get_similar(unrelated), [])
+        self.assert_matches_rebuild()
+
+        self.get_client(author).patch(f'/api/recipes/{unrelated}/', {
+            'ingredients': [
+                {'id': self.ingredients[number].id, 'amount': 1}
+                for number in (0, 1, 2)
+            ],
+        }, format='json')
+        self.assertEqual(self.get_similar(first)[0], unrelated)
+        self.assert_matches_rebuild()
+
+        self.get_client(author).delete(f'/api/recipes/{unrelated}/')
+        self.assertFalse(
+            SimilarRecipe.objects.filter(similar_id=unrelated).exists()
+        )
+
+    def test_missing_recipe(self):
+        response = self.get_client().get('/api/recipes/0/similar/')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(SIMILAR_RECIPES_LIMIT=2)
+    def test_limit(self):
+        recipe_ids = [
+            self.create_recipe(self.users[0], ingredients=(0, number))
+            for number in range(1, 6)
+        ]
+        for recipe_id in recipe_ids:
+            self.assertLessEqual(
+                SimilarRecipe.objects.filter(recipe_id=recipe_id).count(), 2
+            )
+
+    @override_settings(SIMILAR_RECIPES_LIMIT=2)
+    def test_full_lists_only_take_better_recipes(self):
+        author = self.users[0]
+        recipe_ids = [
+            self.create_recipe(author, ingredients=ingredients, tags=(0,))
+            for ingredients in ((0, 1, 2), (0, 1, 3), (0, 4, 5))
+        ]
+        with mock.patch('recipes.similarity.trim_similar_recipes') as trim:
+            weak = self.create_recipe(author, ingredients=(0, 6, 7, 8))
+        trim.assert_not_called()
+        self.assertEqual(len(self.get_similar(weak)), 2)
+        self.assertFalse(
+            SimilarRecipe.objects.filter(similar_id=weak).exists()
+        )
+        strong = self.create_recipe(author, ingredients=(0, 1, 2), tags=(0,))
+        self.assertEqual(
+            SimilarRecipe.objects.filter(similar_id=strong).count(), 2
+        )
+        for recipe_id in recipe_ids:
+            self.assertEqual(len(self.get_similar(recipe_id)), 2)
+        self.assert_matches_rebuild()
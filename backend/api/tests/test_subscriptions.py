@@ -0,0 +1,68 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .base import APITestCase
+
+URL = '/api/users/subscriptions/'
+
+
+class SubscriptionsTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.reader = self.users[4]
+        self.client = self.get_client(self.reader)
+        self.recipes = {
+            author.id: [self.create_recipe(author) for _ in range(count)]
+            for author, count in zip(self.users[:3], (1, 3, 4))
+        }
+
+    def subscribe(self, *authors):
+        for author in authors:
+            response = self.client.post(f'/api/users/{author.id}/subscribe/')
+            self.assertEqual(response.status_code, 201)
+
+    def get_subscriptions(self, **params):
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return {
+            author['id']: author for author in response.json()['results']
+        }
+
+    def test_recipes_limit(self):
+        self.subscribe(*self.users[:3])
+        authors = self.get_subscriptions(recipes_limit=2)
+        self.assertEqual(set(authors), set(self.recipes))
+        for author_id, recipe_ids in self.recipes.items():
+            with self.subTest(author=author_id):
+                newest = sorted(recipe_ids, reverse=True)[:2]
+                self.assertEqual(
+                    [recipe['id'] for recipe in authors[author_id]['recipes']],
+                    newest
+                )
+                self.assertEqual(
+                    authors[author_id]['recipes_count'], len(recipe_ids)
+                )
+                self.assertTrue(authors[author_id]['is_subscribed'])
+
+    def test_without_limit(self):
+        self.subscribe(*self.users[:3])
+        for params in ({}, {'recipes_limit': 'abc'}):
+            with self.subTest(params=params):
+                authors = self.get_subscriptions(**params)
+                for author_id, recipe_ids in self.recipes.items():
+                    self.assertEqual(
+                        [recipe['id']
+                         for recipe in authors[author_id]['recipes']],
+                        sorted(recipe_ids, reverse=True)
+                    )
+
+    def test_constant_queries(self):
+        self.subscribe(self.users[0])
+        with CaptureQueriesContext(connection) as single:
+            self.get_subscriptions(recipes_limit=2)
+        self.subscribe(*self.users[1:3])
+        with CaptureQueriesContext(connection) as several:
+            authors = self.get_subscriptions(recipes_limit=2)
+        self.assertEqual(len(authors), 3)
+        self.assertEqual(len(several), len(single))
@@ -0,0 +1,64 @@
+import base64
+from io import BytesIO
+from unittest.mock import patch
+
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from recipes.images import process_image
+from recipes.models import Recipe
+from .base import APITestCase, call_command_quietly
+
+
+def make_image(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+class ThumbnailsTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        response = self.get_client(self.users[0]).post('/api/recipes/', {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 5,
+            'image': make_image(1600, 1000),
+            'tags': [self.tags[0].id],
+            'ingredients': [{'id': self.ingredients[0].id, 'amount': 1}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.recipe = Recipe.objects.get(pk=response.json()['id'])
+
+    def get_thumbnails(self):
+        return self.get_client().get(
+            f'/api/recipes/{self.recipe.id}/'
+        ).json()['thumbnails']
+
+    def test_original_until_ready(self):
+        thumbnails = self.get_thumbnails()
+        self.assertTrue(
+            thumbnails['small']['webp'].endswith(self.recipe.image.name)
+        )
+        process_image(self.recipe.image.name)
+        thumbnail = self.get_thumbnails()['small']['webp']
+        self.assertTrue(thumbnail.endswith('_small.webp'))
+        name = thumbnail.split('/media/', 1)[1]
+        with default_storage.open(name) as file:
+            self.assertEqual(Image.open(file).size, (320, 200))
+
+    def test_no_storage_lookups(self):
+        with patch.object(
+            default_storage, 'exists', side_effect=AssertionError
+        ):
+            response = self.get_client().get('/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('thumbnails_image', response.json()['results'][0])
+
+    def test_backfill_command(self):
+        call_command_quietly('generate_thumbnails')
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.thumbnails_image, self.recipe.image.name)
@@ -0,0 +1,74 @@
+import json
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from .base import PNG, APITestCase
+
+
+class MultipartUploadTest(APITestCase):
+
+    def get_form(self, image):
+        return {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 3,
+            'image': image,
+            'tags': [tag.id for tag in self.tags[:2]],
+            'ingredients': json.dumps(
+                [{'id': self.ingredients[0].id, 'amount': 2}]
+            ),
+        }
+
+    def post(self, form):
+        return self.get_client(self.users[0]).post(
+            '/api/recipes/', form, format='multipart'
+        )
+
+    def test_create_and_update(self):
+        response = self.post(self.get_form(
+            SimpleUploadedFile('image.PNG', PNG, 'image/png')
+        ))
+        self.assertEqual(response.status_code, 201, response.content)
+        data = response.json()
+        self.assertTrue(data['image'].endswith('.png'))
+        self.assertEqual(len(data['tags']), 2)
+        self.assertEqual(data['ingredients'][0]['amount'], 2)
+        response = self.get_client(self.users[0]).patch(
+            f'/api/recipes/{data["id"]}/',
+            {'image': SimpleUploadedFile('other.png', PNG, 'image/png')},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_base64_still_accepted(self):
+        self.create_recipe(self.users[0])
+
+    def test_not_an_image(self):
+        response = self.post(self.get_form(SimpleUploadedFile(
+            'image.png', b'not a picture at all', 'image/png'
+        )))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.json())
+
+    @patch('api.uploads.RECIPE_IMAGE_MAX_SIZE', 50)
+    def test_image_too_large(self):
+        response = self.post(self.get_form(SimpleUploadedFile(
+            'image.png', PNG + b'0' * 100, 'image/png'
+        )))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.json())
+
+    @patch('api.uploads.RECIPE_UPLOAD_MAX_SIZE', 50)
+    def test_request_too_large(self):
+        response = self.post(self.get_form(
+            SimpleUploadedFile('image.png', PNG, 'image/png')
+        ))
+        self.assertEqual(response.status_code, 413)
+
+    def test_invalid_ingredients_json(self):
+        form = self.get_form(SimpleUploadedFile('image.png', PNG, 'image/png'))
+        form['ingredients'] = '{oops'
+        response = self.post(form)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ingredients', response.json())
@@ -0,0 +1,78 @@
+from recipes.models import (FavoriteRecipe, Recipe, ShoppingCart,
+                            ShoppingCartTotal)
+from recipes.user_lists import add_to_list, remove_from_list
+from .base import APITestCase
+
+
+class UserListsTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.users[0]
+        self.recipe_ids = [
+            self.create_recipe(self.users[1], ingredients=(number,))
+            for number in range(3)
+        ]
+
+    def get_counters(self, field):
+        return list(Recipe.objects.filter(
+            pk__in=self.recipe_ids
+        ).order_by('pk').values_list(field, flat=True))
+
+    def test_add_and_remove_return_written_rows(self):
+        FavoriteRecipe.objects.create(
+            user=self.user, recipe_id=self.recipe_ids[0]
+        )
+        self.assertEqual(
+            sorted(add_to_list(FavoriteRecipe, self.user.id, self.recipe_ids)),
+            self.recipe_ids[1:]
+        )
+        self.assertEqual(
+            add_to_list(FavoriteRecipe, self.user.id, self.recipe_ids), []
+        )
+        self.assertEqual(
+            remove_from_list(
+                FavoriteRecipe, self.user.id, self.recipe_ids[:2]
+            ),
+            self.recipe_ids[:2]
+        )
+        self.assertEqual(
+            remove_from_list(
+                FavoriteRecipe, self.user.id, self.recipe_ids[:2]
+            ),
+            []
+        )
+
+    def test_repeated_bulk_requests_counted_once(self):
+        client = self.get_client(self.user)
+        data = {'recipes': self.recipe_ids}
+        for _ in range(2):
+            response = client.post(
+                '/api/recipes/shopping_cart_bulk/', data, format='json'
+            )
+            self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.get_counters('in_carts_count'), [1, 1, 1])
+        self.assertEqual(
+            sorted(ShoppingCartTotal.objects.filter(
+                user=self.user
+            ).values_list('amount', flat=True)),
+            [1, 1, 1]
+        )
+        for _ in range(2):
+            response = client.delete(
+                '/api/recipes/shopping_cart_bulk/', data, format='json'
+            )
+            self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_counters('in_carts_count'), [0, 0, 0])
+        self.assertFalse(ShoppingCart.objects.exists())
+        self.assertFalse(ShoppingCartTotal.objects.exists())
+
+    def test_non_numeric_id(self):
+        client = self.get_client(self.user)
+        for path in ('favorite', 'shopping_cart'):
+            for method in (client.post, client.delete):
+                response = method(f'/api/recipes/abc/{path}/')
+                self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            client.get('/api/recipes/abc/').status_code, 404
+        )
@@ -0,0 +1,86 @@
+from io import BytesIO
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from foodgram.settings import RECIPE_IMAGE_MAX_SIZE, RECIPE_UPLOAD_MAX_SIZE
+
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+SIGNATURE_LENGTH = 12
+NOT_AN_IMAGE = 'Файл не является картинкой JPEG, PNG, GIF или WebP.'
+
+
+def detect_image_type(head):
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+class RequestTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Слишком большой запрос.'
+    default_code = 'request_too_large'
+
+
+class RejectedUploadedFile(UploadedFile):
+    """Файл, отклонённый при загрузке; причина хранится в error."""
+
+    def __init__(self, name, error):
+        super().__init__(file=BytesIO(), name=name, size=0)
+        self.error = error
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Проверяет размер и формат картинки по мере загрузки.
+
+    Отклонённый файл дальше не читается и не попадает к следующим
+    обработчикам, вместо него в FILES кладётся RejectedUploadedFile.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        if content_length > RECIPE_UPLOAD_MAX_SIZE:
+            raise RequestTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.error = None
+        self.head = b''
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error:
+            return None
+        self.received += len(raw_data)
+        if self.received > RECIPE_IMAGE_MAX_SIZE:
+            self.error = (
+                'Картинка больше '
+                f'{RECIPE_IMAGE_MAX_SIZE // 1024 // 1024} МБ.'
+            )
+            return None
+        if len(self.head) < SIGNATURE_LENGTH:
+            self.head += raw_data[:SIGNATURE_LENGTH - len(self.head)]
+            if (
+                len(self.head) >= SIGNATURE_LENGTH
+                and detect_image_type(self.head) is None
+            ):
+                self.error = NOT_AN_IMAGE
+                return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.error is None and detect_image_type(self.head) is None:
+            self.error = NOT_AN_IMAGE
+        if self.error:
+            return RejectedUploadedFile(self.file_name, self.error)
+        return None
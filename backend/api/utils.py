@@ -0,0 +1,77 @@
+import csv
+from collections import defaultdict
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from foodgram.settings import (EXPORT_CHUNK_SIZE, SHOPPING_CART,
+                               SHOPPING_CART_CSV)
+from recipes.models import Recipe
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def chunked(lines, size=EXPORT_CHUNK_SIZE):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def shopping_cart_text(ingredients):
+    yield SHOPPING_CART
+    for ingredient in ingredients:
+        yield (
+            f'{ingredient["name"]} - {ingredient["total"]}/'
+            f'{ingredient["measurement_unit"]} \n'
+        )
+
+
+def shopping_cart_csv(ingredients):
+    writer = csv.writer(Echo())
+    yield writer.writerow(SHOPPING_CART_CSV)
+    for ingredient in ingredients:
+        yield writer.writerow([
+            ingredient['name'],
+            ingredient['total'],
+            ingredient['measurement_unit']
+        ])
+
+
+def recipes_by_author(author_ids, limit=None):
+    """Рецепты авторов одним запросом, не больше limit на автора.
+
+    Ограничение применяется в базе через ROW_NUMBER() по каждому автору.
+    """
+    queryset = Recipe.objects.filter(author_id__in=author_ids).only(
+        'id', 'author_id', 'name', 'image', 'thumbnails_image',
+        'cooking_time', 'pub_date'
+    )
+    if limit is None:
+        recipes = queryset
+    else:
+        ranked = queryset.annotate(row_number=Window(
+            expression=RowNumber(),
+            partition_by=[F('author_id')],
+            order_by=[F('pub_date').desc(), F('id').desc()]
+        )).order_by()
+        sql, params = ranked.query.sql_with_params()
+        recipes = Recipe.objects.raw(
+            f'SELECT * FROM ({sql}) ranked '
+            f'WHERE ranked.row_number <= %s '
+            f'ORDER BY ranked.row_number',
+            (*params, limit)
+        )
+    result = defaultdict(list)
+    for recipe in recipes:
+        result[recipe.author_id].append(recipe)
+    return result
@@ -1,67 +1,134 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.db import transaction
-from django.db.models import BooleanField, Exists, OuterRef, Sum, Value
-from django.http import HttpResponse
+from django.db import IntegrityError, transaction
+from django.db.models import (BooleanField, Exists, F, OuterRef, Prefetch,
+                              Value)
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
-from foodgram.settings import FILENAME, SHOPPING_CART
-from recipes.models import (FavoriteRecipe, Ingredient, IngredientAmount,
-                            Recipe, ShoppingCart, Tag)
+from foodgram.settings import CSV_FILENAME, FILENAME
+from recipes.cart import (add_recipes_to_cart_totals,
+                          remove_recipes_from_cart_totals)
+from recipes.counters import change_recipe_counter
+from recipes.feed import add_author_to_feed, remove_author_from_feed
+from recipes.models import (FavoriteRecipe, FeedEntry, Ingredient,
+                            IngredientAmount, Recipe, ShoppingCart,
+                            ShoppingCartTotal, Tag)
+from recipes.search import ingredient_index, recipe_ingredient_index
+from recipes.user_lists import add_to_list, remove_from_list
 from users.models import Follow
+from users.stats import change_user_stats
 from .filters import IngredientFilter, RecipeFilter
-from .mixins import AddAndDeleteObjectMixin, ListRetrieveViewSet
+from .mixins import CachedReadMixin, ListRetrieveViewSet, ReplicaReadMixin
+from .paginations import (FeedPagination, RecipePagination,
+                          SubscriptionPagination)
 from .permissions import IsOwnerOrReadOnly
-from .serializers import (CheckFavoriteSerializer, CheckShoppingCartSerializer,
-                          CheckSubscribeSerializer, FollowSerializer,
-                          IngredientSerializer, RecipeAddingSerializer,
-                          RecipeCreateSerializer, RecipeReadSerializer,
+from .serializers import (CheckSubscribeSerializer, CookableRecipeSerializer,
+                          FollowSerializer, IngredientSerializer,
+                          RecipeAddingSerializer, RecipeCreateSerializer,
+                          RecipeIdsSerializer, RecipeReadSerializer,
                           TagSerializer)
+from .uploads import ImageUploadHandler
+from .utils import (chunked, recipes_by_author, shopping_cart_csv,
+                    shopping_cart_text)
 
 User = get_user_model()
 
+ALREADY_ADDED = {
+    FavoriteRecipe: 'Рецепт уже добавлен в избранное',
+    ShoppingCart: 'Этот рецепт уже добавлен в список покупок',
+}
+NOT_ADDED = {
+    FavoriteRecipe: 'Рецепта нет в избранном',
+    ShoppingCart: 'Этот рецепт отсутствует в списке покупок',
+}
 
-class TagViewSet(ListRetrieveViewSet):
+
+class TagViewSet(ReplicaReadMixin, CachedReadMixin, ListRetrieveViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
 
 
-class IngredientViewSet(ListRetrieveViewSet):
+class IngredientViewSet(
+    ReplicaReadMixin, CachedReadMixin, ListRetrieveViewSet
+):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_class = IngredientFilter
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_serializer(
+            ingredient_index.search(name),
+            many=True
+        )
+        return Response(serializer.data)
+
 
-class RecipeViewSet(AddAndDeleteObjectMixin, viewsets.ModelViewSet):
+class RecipeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     permission_classes = (IsOwnerOrReadOnly,)
     filter_class = RecipeFilter
+    pagination_class = RecipePagination
+    parser_classes = (JSONParser, MultiPartParser)
+    lookup_value_regex = r'\d+'
+
+    def initial(self, request, *args, **kwargs):
+        if self.action in ('create', 'update', 'partial_update'):
+            request.upload_handlers.insert(
+                0, ImageUploadHandler(request._request)
+            )
+        super().initial(request, *args, **kwargs)
 
     def get_serializer_class(self):
-        if self.request in SAFE_METHODS:
+        if self.request.method in SAFE_METHODS:
             return RecipeReadSerializer
         return RecipeCreateSerializer
 
     def get_queryset(self):
-        if self.request.user.is_authenticated:
-            return Recipe.objects.annotate(
+        user = self.request.user
+        if user.is_authenticated:
+            authors = User.objects.annotate(
+                is_subscribed=Exists(Follow.objects.filter(
+                    user=user, author=OuterRef('pk'))
+                )
+            )
+            queryset = Recipe.objects.annotate(
                 is_favorited=Exists(FavoriteRecipe.objects.filter(
-                    user=self.request.user, recipe__pk=OuterRef('pk'))
+                    user=user, recipe__pk=OuterRef('pk'))
                 ),
                 is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
-                    user=self.request.user, recipe__pk=OuterRef('pk'))
+                    user=user, recipe__pk=OuterRef('pk'))
                 )
             )
-        return Recipe.objects.annotate(
-            is_favorited=Value(False, output_field=BooleanField()),
-            is_in_shopping_cart=Value(False, output_field=BooleanField())
+        else:
+            authors = User.objects.annotate(
+                is_subscribed=Value(False, output_field=BooleanField())
+            )
+            queryset = Recipe.objects.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField())
+            )
+        return queryset.prefetch_related(
+            Prefetch('author', queryset=authors),
+            'tags',
+            Prefetch(
+                'recipes',
+                queryset=IngredientAmount.objects.select_related('ingredient')
+            )
         )
 
     @action(
@@ -70,21 +137,23 @@ class RecipeViewSet(AddAndDeleteObjectMixin, viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def favorite(self, request, pk=None):
-        return self.add_object_method(
-            request=request,
-            pk=pk,
-            serializer_class=CheckFavoriteSerializer,
-            model=FavoriteRecipe
-        )
+        return self.add_object(FavoriteRecipe, request.user, pk)
 
     @favorite.mapping.delete
     def del_favorite(self, request, pk=None):
-        return self.delete_object_method(
-            request=request,
-            pk=pk,
-            serializer_class=CheckFavoriteSerializer,
-            model=FavoriteRecipe
-        )
+        return self.delete_object(FavoriteRecipe, request.user, pk)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[IsAuthenticated]
+    )
+    def favorite_bulk(self, request):
+        return self.add_objects(FavoriteRecipe, request)
+
+    @favorite_bulk.mapping.delete
+    def del_favorite_bulk(self, request):
+        return self.delete_objects(FavoriteRecipe, request)
 
     @action(
         detail=True,
@@ -92,58 +161,182 @@ class RecipeViewSet(AddAndDeleteObjectMixin, viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def shopping_cart(self, request, pk=None):
-        return self.add_object_method(
-            request=request,
-            pk=pk,
-            serializer_class=CheckShoppingCartSerializer,
-            model=ShoppingCart
-        )
+        return self.add_object(ShoppingCart, request.user, pk)
 
     @shopping_cart.mapping.delete
     def del_shopping_cart(self, request, pk=None):
-        return self.delete_object_method(
-            request=request,
-            pk=pk,
-            serializer_class=CheckShoppingCartSerializer,
-            model=ShoppingCart
-        )
+        return self.delete_object(ShoppingCart, request.user, pk)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[IsAuthenticated]
+    )
+    def shopping_cart_bulk(self, request):
+        return self.add_objects(ShoppingCart, request)
+
+    @shopping_cart_bulk.mapping.delete
+    def del_shopping_cart_bulk(self, request):
+        return self.delete_objects(ShoppingCart, request)
 
     @transaction.atomic()
     def add_object(self, model, user, pk):
         recipe = get_object_or_404(Recipe, id=pk)
-        model.objects.create(user=user, recipe=recipe)
+        try:
+            with transaction.atomic():
+                model.objects.create(user=user, recipe=recipe)
+        except IntegrityError:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [ALREADY_ADDED[model]]}
+            )
+        self.objects_added(model, user, [recipe.id])
         serializer = RecipeAddingSerializer(recipe)
         return Response(serializer.data, status=HTTPStatus.CREATED)
 
     @transaction.atomic()
     def delete_object(self, model, user, pk):
-        model.objects.filter(user=user, recipe__id=pk).delete()
+        deleted, _ = model.objects.filter(user=user, recipe__id=pk).delete()
+        if not deleted:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [NOT_ADDED[model]]}
+            )
+        self.objects_deleted(model, user, [pk])
+        return Response(status=HTTPStatus.NO_CONTENT)
+
+    @transaction.atomic()
+    def add_objects(self, model, request):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.validated_data['recipes']
+        added = add_to_list(
+            model, request.user.id, [recipe.id for recipe in recipes]
+        )
+        self.objects_added(model, request.user, added)
+        serializer = RecipeAddingSerializer(recipes, many=True)
+        return Response(serializer.data, status=HTTPStatus.CREATED)
+
+    @transaction.atomic()
+    def delete_objects(self, model, request):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        deleted = remove_from_list(
+            model,
+            request.user.id,
+            [recipe.id for recipe in serializer.validated_data['recipes']]
+        )
+        self.objects_deleted(model, request.user, deleted)
         return Response(status=HTTPStatus.NO_CONTENT)
 
+    def objects_added(self, model, user, recipe_ids):
+        if not recipe_ids:
+            return
+        change_recipe_counter(model, recipe_ids, 1)
+        if model is ShoppingCart:
+            add_recipes_to_cart_totals(user.id, recipe_ids)
+
+    def objects_deleted(self, model, user, recipe_ids):
+        if not recipe_ids:
+            return
+        change_recipe_counter(model, recipe_ids, -1)
+        if model is ShoppingCart:
+            remove_recipes_from_cart_totals(user.id, recipe_ids)
+
+    @action(detail=False)
+    def cook(self, request):
+        try:
+            ingredient_ids = {
+                int(pk)
+                for value in request.query_params.getlist('ingredients')
+                for pk in value.split(',') if pk.strip()
+            }
+        except ValueError:
+            raise ValidationError({
+                'ingredients': ['Ожидаются id ингредиентов через запятую.']
+            })
+        found = recipe_ingredient_index.search(ingredient_ids)
+        recipes = Recipe.objects.in_bulk(
+            [recipe_id for recipe_id, _, _ in found]
+        )
+        result = []
+        for recipe_id, matched, missing in found:
+            recipe = recipes.get(recipe_id)
+            if recipe is not None:
+                recipe.matched = matched
+                recipe.missing = missing
+                result.append(recipe)
+        serializer = CookableRecipeSerializer(
+            result,
+            many=True,
+            context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        recipe = get_object_or_404(Recipe, pk=pk)
+        similar = Recipe.objects.filter(
+            similar_to__recipe=recipe
+        ).order_by('-similar_to__score', 'id')
+        serializer = RecipeAddingSerializer(
+            similar,
+            many=True,
+            context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        pagination_class=FeedPagination
+    )
+    def feed(self, request):
+        entries = self.paginate_queryset(
+            FeedEntry.objects.filter(user=request.user)
+        )
+        recipes = self.get_queryset().in_bulk(
+            [entry.recipe_id for entry in entries]
+        )
+        serializer = RecipeReadSerializer(
+            [recipes[entry.recipe_id] for entry in entries
+             if entry.recipe_id in recipes],
+            many=True,
+            context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
     @action(
         methods=['get'],
         detail=False,
         permission_classes=[IsAuthenticated]
     )
     def download_shopping_cart(self, request):
-        ingredients = IngredientAmount.objects.filter(
-            recipe__cart__user=request.user
+        # Итогов у пользователя не больше, чем ингредиентов в каталоге.
+        # Они читаются здесь, пока действуют маршрутизация на реплику и
+        # учёт запросов в Server-Timing; построчно отдаётся только файл.
+        ingredients = list(ShoppingCartTotal.objects.filter(
+            user=request.user
         ).values(
-            'ingredient__name',
-            'ingredient__measurement_unit'
-        ).order_by('ingredient__name').annotate(total=Sum('amount'))
-        result = SHOPPING_CART
-        for ingredient in ingredients:
-            result += ''.join([
-                f'{ingredient["ingredient__name"]} - {ingredient["total"]}/'
-                f'{ingredient["ingredient__measurement_unit"]} \n'
-            ])
-        response = HttpResponse(result, content_type='text/plain')
-        response['Content-Disposition'] = f'attachment; filename={FILENAME}'
+            name=F('ingredient__name'),
+            measurement_unit=F('ingredient__measurement_unit'),
+            total=F('amount')
+        ).order_by('name'))
+        if request.query_params.get('type') == 'csv':
+            lines = shopping_cart_csv(ingredients)
+            content_type = 'text/csv'
+            filename = CSV_FILENAME
+        else:
+            lines = shopping_cart_text(ingredients)
+            content_type = 'text/plain'
+            filename = FILENAME
+        response = StreamingHttpResponse(
+            chunked(lines),
+            content_type=f'{content_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename={filename}'
         return response
 
 
-class FollowViewSet(UserViewSet):
+class FollowViewSet(ReplicaReadMixin, UserViewSet):
     """Вьюсет подписки"""
     @action(
         methods=['post'],
@@ -165,7 +358,13 @@ class FollowViewSet(UserViewSet):
         )
         serializer.is_valid(raise_exception=True)
         result = Follow.objects.create(user=user, author=author)
-        serializer = FollowSerializer(result, context={'request': request})
+        change_user_stats(author.id, followers_count=1)
+        add_author_to_feed(user.id, author.id)
+        follow = self.get_subscriptions(user).get(pk=result.pk)
+        serializer = FollowSerializer(
+            follow,
+            context=self.get_subscriptions_context(request, [follow])
+        )
         return Response(serializer.data, status=HTTPStatus.CREATED)
 
     @subscribe.mapping.delete
@@ -182,18 +381,41 @@ class FollowViewSet(UserViewSet):
             context={'request': request},
         )
         serializer.is_valid(raise_exception=True)
-        user.follower.filter(author=author).delete()
+        deleted, _ = user.follower.filter(author=author).delete()
+        if deleted:
+            change_user_stats(author.id, followers_count=-1)
+            remove_author_from_feed(user.id, author.id)
         return Response(status=HTTPStatus.NO_CONTENT)
 
     @action(
         detail=False,
-        permission_classes=[IsAuthenticated]
+        permission_classes=[IsAuthenticated],
+        pagination_class=SubscriptionPagination
     )
     def subscriptions(self, request):
-        user = request.user
-        queryset = user.follower.all()
+        queryset = self.get_subscriptions(request.user)
         pages = self.paginate_queryset(queryset)
         serializer = FollowSerializer(
-            pages, many=True, context={'request': request}
+            pages,
+            many=True,
+            context=self.get_subscriptions_context(request, pages)
         )
         return self.get_paginated_response(serializer.data)
+
+    def get_subscriptions(self, user):
+        return user.follower.select_related('author').annotate(
+            recipes_count=Coalesce('author__stats__recipes_count', 0),
+            is_subscribed=Exists(Follow.objects.filter(
+                user=user, author=OuterRef('author'))
+            )
+        )
+
+    def get_subscriptions_context(self, request, follows):
+        limit = request.query_params.get('recipes_limit')
+        return {
+            'request': request,
+            'recipes': recipes_by_author(
+                [follow.author_id for follow in follows],
+                int(limit) if limit and limit.isdigit() else None
+            )
+        }
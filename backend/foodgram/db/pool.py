@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolExhausted(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Пул соединений с базой внутри процесса.
+
+    Держит не больше max_size соединений, свободные дольше idle_timeout
+    секунд закрываются. Если все соединения заняты, acquire ждёт
+    освобождения не дольше timeout секунд.
+    """
+
+    def __init__(self, max_size, idle_timeout, timeout):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.idle = deque()
+        self.size = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, connect):
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            while True:
+                self.close_expired()
+                while self.idle:
+                    _, connection = self.idle.pop()
+                    if not connection.closed:
+                        return connection
+                    self.size -= 1
+                if self.size < self.max_size:
+                    self.size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhausted(
+                        f'Все {self.max_size} соединений пула заняты.'
+                    )
+                self.condition.wait(remaining)
+        try:
+            return connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, connection, reusable=True):
+        with self.condition:
+            if reusable and not connection.closed:
+                self.idle.append((time.monotonic(), connection))
+            else:
+                self.size -= 1
+                self.close_quietly(connection)
+            self.condition.notify()
+
+    def close_expired(self):
+        now = time.monotonic()
+        while self.idle and now - self.idle[0][0] > self.idle_timeout:
+            _, connection = self.idle.popleft()
+            self.size -= 1
+            self.close_quietly(connection)
+
+    def close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
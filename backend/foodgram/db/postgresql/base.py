@@ -0,0 +1,85 @@
+import threading
+from functools import partial
+
+from django.db.backends.postgresql import base
+
+from foodgram.db.pool import ConnectionPool, PoolExhausted
+
+Database = base.Database
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL с проверкой постоянных соединений и пулом соединений.
+
+    CONN_HEALTH_CHECKS: соединение, оставшееся с прошлого запроса или
+    взятое из пула, проверяется при первом использовании в запросе.
+    POOL: параметры ConnectionPool, общего для потоков процесса.
+    """
+    health_check_done = False
+    fresh_connection = False
+
+    def get_pool(self):
+        options = self.settings_dict.get('POOL')
+        if not options:
+            return None
+        with pools_lock:
+            if self.alias not in pools:
+                pools[self.alias] = ConnectionPool(**options)
+            return pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        if pool is None:
+            self.fresh_connection = True
+            return super().get_new_connection(conn_params)
+        self.fresh_connection = False
+        try:
+            connection = pool.acquire(
+                partial(self.open_pooled_connection, conn_params)
+            )
+        except PoolExhausted as error:
+            raise Database.OperationalError(str(error)) from error
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def open_pooled_connection(self, conn_params):
+        self.fresh_connection = True
+        return super().get_new_connection(conn_params)
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = self.fresh_connection
+
+    def ensure_connection(self):
+        super().ensure_connection()
+        while (
+            not self.health_check_done
+            and not self.in_atomic_block
+            and self.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            self.health_check_done = True
+            if self.is_usable():
+                break
+            self.close()
+            super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        try:
+            self.connection.rollback()
+        except Database.Error:
+            reusable = False
+        else:
+            reusable = True
+        pool.release(self.connection, reusable)
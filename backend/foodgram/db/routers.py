@@ -0,0 +1,66 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def primary_reads():
+    """Чтения блока идут на основную базу.
+
+    Нужно для данных, которые кешируются до смены версии: прочитанные с
+    отставшей реплики, они остались бы в кеше устаревшими.
+    """
+    token = replica_reads.set(False)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+def get_pin_cache_key(user_id):
+    return f'db:pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """Направляет чтения пользователя на основную базу после записи."""
+    cache.set(
+        get_pin_cache_key(user.pk), True, settings.REPLICA_PIN_TIMEOUT
+    )
+
+
+def is_pinned(user):
+    return cache.get(get_pin_cache_key(user.pk)) is not None
+
+
+class ReplicaRouter:
+    """Отправляет чтения на реплики, если их включило представление.
+
+    Реплики перечислены в REPLICA_DATABASES. Чтения идут на случайную
+    реплику только внутри запроса, для которого установлен replica_reads,
+    и вне транзакции основной базы, чтобы не читать мимо своих записей.
+    Запись всегда идёт в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            not settings.REPLICA_DATABASES
+            or not replica_reads.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,158 @@
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+current_timings = ContextVar('current_timings', default=None)
+
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+IN_LIST_PATTERN = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+METRICS = ('db', 'serialize', 'render')
+
+
+def normalize_sql(sql):
+    """Текст запроса без значений параметров и длины списков IN."""
+    return IN_LIST_PATTERN.sub('IN (...)', LITERAL_PATTERN.sub('?', sql))
+
+
+class RequestTimings:
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.queries = Counter()
+        self.running = set()
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations['db'] += time.perf_counter() - start
+            self.queries[normalize_sql(sql)] += 1
+
+    def duplicates(self):
+        """Запросы, повторённые не меньше порога раз, - признак N+1."""
+        return {
+            sql: count for sql, count in self.queries.most_common()
+            if count >= settings.SERVER_TIMING_DUPLICATE_THRESHOLD
+        }
+
+    def header(self, total):
+        metrics = [
+            f'db;dur={self.durations["db"] * 1000:.1f};'
+            f'desc="{self.query_count} queries"'
+        ]
+        metrics.extend(
+            f'{name};dur={self.durations[name] * 1000:.1f}'
+            for name in METRICS[1:]
+        )
+        duplicates = self.duplicates()
+        if duplicates:
+            metrics.append(f'dup;desc="{len(duplicates)} repeated queries"')
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def as_dict(self, total):
+        result = {
+            f'{name}_ms': round(self.durations[name] * 1000, 1)
+            for name in METRICS
+        }
+        result['total_ms'] = round(total * 1000, 1)
+        result['queries'] = self.query_count
+        result['duplicates'] = [
+            {'sql': sql, 'count': count}
+            for sql, count in self.duplicates().items()
+        ]
+        return result
+
+
+@contextmanager
+def timed(name):
+    """Добавляет время выполнения блока к метрике name текущего запроса.
+
+    Вложенные блоки с тем же именем не учитываются повторно.
+    """
+    timings = current_timings.get()
+    if timings is None or name in timings.running:
+        yield
+        return
+    timings.running.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.durations[name] += time.perf_counter() - start
+        timings.running.discard(name)
+
+
+class ServerTimingMiddleware:
+    """Заголовок Server-Timing и выборочный журнал времени запросов.
+
+    Включается настройкой SERVER_TIMING. Учитывает число и время
+    запросов к базе, время сериализации, отрисовки ответа и повторяющиеся
+    запросы. Время сериализации включает запросы, сделанные во время неё.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total = time.perf_counter() - start
+        response['Server-Timing'] = timings.header(total)
+        self.log(request, response, timings, total)
+        return response
+
+    def process_template_response(self, request, response):
+        timings = current_timings.get()
+        if timings is not None:
+            start = time.perf_counter()
+
+            def rendered(rendered_response):
+                timings.durations['render'] += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def log(self, request, response, timings, total):
+        data = timings.as_dict(total)
+        if (
+            not data['duplicates']
+            and random.random() >= settings.SERVER_TIMING_LOG_SAMPLE_RATE
+        ):
+            return
+        data.update(
+            method=request.method,
+            path=request.path,
+            status=response.status_code
+        )
+        logger.log(
+            logging.WARNING if data['duplicates'] else logging.INFO,
+            json.dumps(data, ensure_ascii=False)
+        )
@@ -1,4 +1,6 @@
 import os
+import tempfile
+from itertools import zip_longest
 
 from dotenv import load_dotenv
 
@@ -31,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'foodgram.performance.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,6 +64,8 @@ TEMPLATES = [
 WSGI_APPLICATION = 'foodgram.wsgi.application'
 
 
+DB_POOL = os.getenv('DB_POOL', default='false').lower() == 'true'
+
 DATABASES = {
     'default': {
         'ENGINE': os.getenv('DB_ENGINE'),
@@ -68,10 +73,43 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # С пулом соединение возвращается в пул после каждого запроса.
+        'CONN_MAX_AGE': 0 if DB_POOL else int(
+            os.getenv('DB_CONN_MAX_AGE', default='60')
+        ),
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', default='true'
+        ).lower() == 'true',
+        'POOL': {
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', default='10')),
+            'idle_timeout': int(
+                os.getenv('DB_POOL_IDLE_TIMEOUT', default='300')
+            ),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', default='10')),
+        } if DB_POOL else None,
     }
 }
 
+# Реплики для чтения: хосты и имена баз через запятую. Недостающие
+# значения берутся из основной базы, так что для проверки на SQLite
+# достаточно DB_REPLICA_NAMES с путём к копии файла базы.
+REPLICA_DATABASES = []
+for number, (host, name) in enumerate(zip_longest(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')),
+    filter(None, os.getenv('DB_REPLICA_NAMES', default='').split(','))
+), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host or DATABASES['default']['HOST'],
+        'NAME': name or DATABASES['default']['NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['foodgram.db.routers.ReplicaRouter']
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
@@ -80,6 +118,40 @@ DATABASES = {
 # }
 
 
+# Кеш должен быть общим для всех процессов: в нём версии справочников,
+# токены и закрепление чтений за основной базой. Файловый кеш общий для
+# процессов одной машины, для нескольких машин нужен memcached.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            default=os.path.join(tempfile.gettempdir(), 'foodgram_cache')
+        ),
+    }
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'foodgram.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -116,7 +188,7 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'],
@@ -143,4 +215,28 @@ DJOSER = {
 }
 
 FILENAME = 'shopping_cart.txt'
+CSV_FILENAME = 'shopping_cart.csv'
 SHOPPING_CART = 'Cписок покупок:\n\nНазвание продукта - Кол-во/Ед.изм.\n'
+SHOPPING_CART_CSV = ['Название продукта', 'Кол-во', 'Ед.изм.']
+EXPORT_CHUNK_SIZE = 500
+INGREDIENT_SEARCH_LIMIT = 20
+READ_CACHE_TIMEOUT = 60 * 60 * 24
+BULK_LIMIT = 100
+SEARCH_CONFIG = 'russian'
+RECIPE_THUMBNAIL_SIZES = {'small': 320, 'medium': 640}
+RECIPE_THUMBNAIL_QUALITY = 80
+RECIPE_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+RECIPE_UPLOAD_MAX_SIZE = RECIPE_IMAGE_MAX_SIZE + 1024 * 1024
+SIMILAR_RECIPES_LIMIT = 10
+SIMILAR_TAG_WEIGHT = 0.5
+COOK_SEARCH_LIMIT = 20
+COOK_INDEX_OVERLAY_LIMIT = 1000
+COOK_INDEX_SYNC_MARGIN = 60
+COOK_INDEX_LOG_TIMEOUT = 60 * 60 * 24
+SERVER_TIMING = os.getenv('SERVER_TIMING', default='false').lower() == 'true'
+SERVER_TIMING_LOG_SAMPLE_RATE = float(
+    os.getenv('SERVER_TIMING_LOG_SAMPLE_RATE', default='0.01')
+)
+SERVER_TIMING_DUPLICATE_THRESHOLD = 5
+TOKEN_CACHE_TIMEOUT = 60 * 5
+REPLICA_PIN_TIMEOUT = 10
@@ -0,0 +1,60 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.tests.base import APITestCase
+from foodgram.performance import ServerTimingMiddleware, normalize_sql
+from recipes.models import Recipe
+
+
+def repeated_queries_view(request):
+    for recipe in Recipe.objects.all():
+        recipe.author.username
+    return HttpResponse('ok')
+
+
+class ServerTimingTest(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        for _ in range(3):
+            self.create_recipe(self.users[0])
+
+    @override_settings(
+        SERVER_TIMING=True, SERVER_TIMING_LOG_SAMPLE_RATE=1.0
+    )
+    def test_header(self):
+        with self.assertLogs('foodgram.performance', 'INFO'):
+            response = self.get_client(self.users[1]).get('/api/recipes/')
+        header = response['Server-Timing']
+        for metric in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;'):
+            self.assertIn(metric, header)
+        self.assertNotIn('dup;', header)
+
+    @override_settings(
+        SERVER_TIMING=True,
+        SERVER_TIMING_LOG_SAMPLE_RATE=0,
+        SERVER_TIMING_DUPLICATE_THRESHOLD=2
+    )
+    def test_repeated_queries(self):
+        middleware = ServerTimingMiddleware(repeated_queries_view)
+        with self.assertLogs('foodgram.performance', 'WARNING'):
+            response = middleware(RequestFactory().get('/'))
+        self.assertIn('dup;', response['Server-Timing'])
+
+    def test_disabled(self):
+        response = self.get_client(self.users[1]).get('/api/recipes/')
+        self.assertNotIn('Server-Timing', response)
+
+
+class NormalizeSqlTest(SimpleTestCase):
+
+    def test_parameters_removed(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT a FROM t WHERE id IN (%s, %s) AND x = 'a''b' "
+                "AND y = 3"
+            ),
+            normalize_sql(
+                "SELECT a FROM t WHERE id IN (%s) AND x = 'q' AND y = 44"
+            )
+        )
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from foodgram.db.pool import ConnectionPool, PoolExhausted
+
+
+class FakeConnection:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def fail():
+    raise RuntimeError
+
+
+class ConnectionPoolTest(SimpleTestCase):
+
+    def test_limit_and_reuse(self):
+        pool = ConnectionPool(max_size=2, idle_timeout=60, timeout=0.05)
+        first = pool.acquire(FakeConnection)
+        second = pool.acquire(FakeConnection)
+        with self.assertRaises(PoolExhausted):
+            pool.acquire(FakeConnection)
+        pool.release(first)
+        self.assertIs(pool.acquire(FakeConnection), first)
+        pool.release(second, reusable=False)
+        self.assertTrue(second.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_idle_expiry(self):
+        pool = ConnectionPool(max_size=1, idle_timeout=0.05, timeout=1)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        time.sleep(0.1)
+        self.assertIsNot(pool.acquire(FakeConnection), connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_waits_for_release(self):
+        pool = ConnectionPool(max_size=1, idle_timeout=60, timeout=2)
+        connection = pool.acquire(FakeConnection)
+        threading.Timer(0.05, pool.release, [connection]).start()
+        self.assertIs(pool.acquire(FakeConnection), connection)
+
+    def test_failed_connect_frees_slot(self):
+        pool = ConnectionPool(max_size=1, idle_timeout=60, timeout=0.05)
+        with self.assertRaises(RuntimeError):
+            pool.acquire(fail)
+        self.assertEqual(pool.size, 0)
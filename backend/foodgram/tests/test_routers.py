@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS
+from django.test import SimpleTestCase, override_settings
+
+from foodgram.db.routers import ReplicaRouter, primary_reads, replica_reads
+from recipes.models import Recipe
+
+
+@contextmanager
+def default_connection(in_atomic_block):
+    connections = {
+        DEFAULT_DB_ALIAS: SimpleNamespace(in_atomic_block=in_atomic_block)
+    }
+    with mock.patch('foodgram.db.routers.connections', connections):
+        yield
+
+
+@contextmanager
+def replica_reads_enabled():
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReplicaRouterTest(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_read_from_replica(self):
+        with default_connection(False), replica_reads_enabled():
+            self.assertEqual(self.router.db_for_read(Recipe), 'replica1')
+
+    def test_read_from_primary(self):
+        with default_connection(False):
+            self.assertEqual(
+                self.router.db_for_read(Recipe), DEFAULT_DB_ALIAS
+            )
+            with replica_reads_enabled(), primary_reads():
+                self.assertEqual(
+                    self.router.db_for_read(Recipe), DEFAULT_DB_ALIAS
+                )
+        with default_connection(True), replica_reads_enabled():
+            self.assertEqual(
+                self.router.db_for_read(Recipe), DEFAULT_DB_ALIAS
+            )
+
+    def test_without_replicas(self):
+        with self.settings(REPLICA_DATABASES=[]):
+            with default_connection(False), replica_reads_enabled():
+                self.assertEqual(
+                    self.router.db_for_read(Recipe), DEFAULT_DB_ALIAS
+                )
+
+    def test_write_to_primary(self):
+        with default_connection(False), replica_reads_enabled():
+            self.assertEqual(
+                self.router.db_for_write(Recipe), DEFAULT_DB_ALIAS
+            )
@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from .models import (FavoriteRecipe, Ingredient, IngredientAmount, Recipe,
-                     ShoppingCart, Tag)
+                     ShoppingCart, ShoppingCartTotal, Tag)
 
 
 @admin.register(Tag)
@@ -17,14 +17,12 @@ class IngredientAdmin(admin.ModelAdmin):
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('name', 'author')
+    list_display = ('name', 'author', 'favorites_count')
     list_filter = ('name', 'author', 'tags')
-    readonly_fields = ('count_favorites',)
-
-    def count_favorites(self, obj):
-        return obj.favorites.count()
+    readonly_fields = ('favorites_count', 'in_carts_count')
 
 
 admin.site.register(IngredientAmount)
 admin.site.register(FavoriteRecipe)
 admin.site.register(ShoppingCart)
+admin.site.register(ShoppingCartTotal)
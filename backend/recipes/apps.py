@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class RecipesConfig(AppConfig):
     name = 'recipes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .versions import check_shared_cache
+        check_shared_cache()
@@ -0,0 +1,97 @@
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+
+from .models import IngredientAmount, ShoppingCart, ShoppingCartTotal
+
+
+def apply_cart_deltas(user_ids, deltas):
+    """Изменяет итоги списков покупок пользователей на заданные величины.
+
+    deltas - словарь {id ингредиента: изменение количества}. Строки с
+    нулевым или отрицательным итогом удаляются.
+    """
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items() if delta
+    }
+    user_ids = list(user_ids)
+    if not deltas or not user_ids:
+        return
+    ShoppingCartTotal.objects.bulk_create(
+        [ShoppingCartTotal(user_id=user_id, ingredient_id=ingredient_id)
+         for user_id in user_ids
+         for ingredient_id, delta in deltas.items() if delta > 0],
+        ignore_conflicts=True
+    )
+    totals = ShoppingCartTotal.objects.filter(
+        user_id__in=user_ids,
+        ingredient_id__in=deltas
+    )
+    totals.update(amount=F('amount') + Case(
+        *[When(ingredient_id=ingredient_id, then=Value(delta))
+          for ingredient_id, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    ))
+    totals.filter(amount__lte=0).delete()
+
+
+def recipe_amounts(recipe_ids):
+    """Суммарное количество каждого ингредиента в рецептах recipe_ids."""
+    return dict(IngredientAmount.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by().values('ingredient_id').annotate(
+        total=Sum('amount')
+    ).values_list('ingredient_id', 'total'))
+
+
+def add_recipes_to_cart_totals(user_id, recipe_ids):
+    apply_cart_deltas([user_id], recipe_amounts(recipe_ids))
+
+
+def remove_recipes_from_cart_totals(user_id, recipe_ids):
+    apply_cart_deltas([user_id], {
+        ingredient_id: -amount
+        for ingredient_id, amount in recipe_amounts(recipe_ids).items()
+    })
+
+
+def remove_recipe_from_all_carts(recipe_id):
+    """Вычитает рецепт из итогов всех списков покупок, где он есть."""
+    apply_cart_deltas(
+        ShoppingCart.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('user_id', flat=True),
+        {ingredient_id: -amount
+         for ingredient_id, amount in recipe_amounts([recipe_id]).items()}
+    )
+
+
+def change_recipe_in_cart_totals(recipe_id, old_amounts, new_amounts):
+    """Переносит изменение состава рецепта в списки покупок."""
+    deltas = {
+        ingredient_id: (
+            new_amounts.get(ingredient_id, 0)
+            - old_amounts.get(ingredient_id, 0)
+        )
+        for ingredient_id in old_amounts.keys() | new_amounts.keys()
+    }
+    if not any(deltas.values()):
+        return
+    apply_cart_deltas(
+        ShoppingCart.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('user_id', flat=True),
+        deltas
+    )
+
+
+def calculate_cart_totals():
+    """Итоги списков покупок, посчитанные заново по корзинам."""
+    return ShoppingCart.objects.filter(
+        recipe__recipes__isnull=False
+    ).values(
+        'user_id',
+        ingredient_id=F('recipe__recipes__ingredient')
+    ).annotate(
+        total=Sum('recipe__recipes__amount')
+    ).order_by('user_id', 'ingredient_id')
@@ -0,0 +1,130 @@
+import csv
+import io
+from collections import Counter
+from itertools import islice
+
+from django.db import connection, transaction
+
+from .models import Ingredient
+
+STAGING_TABLE = 'ingredient_sync'
+HEADER = ['name', 'measurement_unit']
+NAME_LENGTH = Ingredient._meta.get_field('name').max_length
+UNIT_LENGTH = Ingredient._meta.get_field('measurement_unit').max_length
+
+
+def read_catalog(path):
+    """Строки каталога (название, единица) из CSV.
+
+    Первая строка пропускается, если это заголовок name,measurement_unit:
+    data/ingredients.csv в backend с заголовком, в корне проекта - без.
+    """
+    with open(path, encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        first = next(reader, None)
+        if first is not None and [
+            value.strip() for value in first
+        ] != HEADER:
+            yield first
+        yield from reader
+
+
+def clean_rows(rows, stats):
+    """Отбрасывает неполные и слишком длинные строки, считая их в stats."""
+    for row in rows:
+        if len(row) != 2:
+            stats['skipped'] += 1
+            continue
+        name, unit = (value.strip() for value in row)
+        if not name or not unit or (
+            len(name) > NAME_LENGTH or len(unit) > UNIT_LENGTH
+        ):
+            stats['skipped'] += 1
+            continue
+        yield name, unit
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+class CsvStream:
+    """Файлоподобный поток CSV из строк для COPY, без буфера на весь файл."""
+
+    def __init__(self, rows, batch_size):
+        self.batches = batches(rows, batch_size)
+        self.buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            batch = next(self.batches, None)
+            if batch is None:
+                break
+            output = io.StringIO()
+            csv.writer(output).writerows(batch)
+            self.buffer += output.getvalue()
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+@transaction.atomic()
+def sync_ingredients(rows, batch_size=1000):
+    """Добавляет ингредиенты каталога, которых ещё нет в базе.
+
+    Ключ - пара (название, единица измерения), других полей у
+    ингредиента нет, поэтому существующие строки не меняются. Возвращает
+    счётчики inserted, unchanged и skipped.
+    """
+    stats = Counter(inserted=0, unchanged=0, skipped=0)
+    rows = clean_rows(rows, stats)
+    if connection.vendor == 'postgresql':
+        sync_with_copy(rows, batch_size, stats)
+    else:
+        for batch in batches(rows, batch_size):
+            sync_batch(batch, stats)
+    return stats
+
+
+def sync_batch(batch, stats):
+    keys = set(batch)
+    existing = set(Ingredient.objects.filter(
+        name__in={name for name, _ in keys}
+    ).values_list('name', 'measurement_unit'))
+    new = keys - existing
+    Ingredient.objects.bulk_create(
+        [Ingredient(name=name, measurement_unit=unit) for name, unit in new],
+        ignore_conflicts=True
+    )
+    stats['inserted'] += len(new)
+    stats['unchanged'] += len(batch) - len(new)
+
+
+def sync_with_copy(rows, batch_size, stats):
+    """Загрузка через COPY во временную таблицу и один INSERT."""
+    table = Ingredient._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE {STAGING_TABLE} '
+            f'(name varchar({NAME_LENGTH}), '
+            f'measurement_unit varchar({UNIT_LENGTH})) ON COMMIT DROP'
+        )
+        cursor.copy_expert(
+            f'COPY {STAGING_TABLE} (name, measurement_unit) '
+            f'FROM STDIN WITH (FORMAT csv)',
+            CsvStream(rows, batch_size)
+        )
+        cursor.execute(f'SELECT count(*) FROM {STAGING_TABLE}')
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            f'INSERT INTO {table} (name, measurement_unit) '
+            f'SELECT DISTINCT name, measurement_unit FROM {STAGING_TABLE} '
+            f'ON CONFLICT (name, measurement_unit) DO NOTHING'
+        )
+        stats['inserted'] += cursor.rowcount
+        stats['unchanged'] += total - cursor.rowcount
@@ -0,0 +1,28 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import FavoriteRecipe, Recipe, ShoppingCart
+
+COUNTER_FIELDS = {
+    FavoriteRecipe: 'favorites_count',
+    ShoppingCart: 'in_carts_count',
+}
+
+
+def change_recipe_counter(model, recipe_ids, delta):
+    """Атомарно изменяет счётчик рецептов, связанный с моделью model."""
+    field = COUNTER_FIELDS[model]
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        **{field: F(field) + delta}
+    )
+
+
+def count_subquery(model, field, outer_field='pk'):
+    """Количество строк model, ссылающихся через field на внешний объект."""
+    return Coalesce(Subquery(
+        model.objects.filter(
+            **{field: OuterRef(outer_field)}
+        ).order_by().values(field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
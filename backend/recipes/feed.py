@@ -0,0 +1,52 @@
+from users.models import Follow
+from .models import FeedEntry, Recipe
+
+BATCH_SIZE = 1000
+
+
+def add_recipe_to_feeds(recipe):
+    """Добавляет новый рецепт в ленты всех подписчиков автора."""
+    followers = Follow.objects.filter(
+        author_id=recipe.author_id
+    ).values_list('user_id', flat=True)
+    FeedEntry.objects.bulk_create(
+        [FeedEntry(
+            user_id=user_id,
+            recipe_id=recipe.id,
+            author_id=recipe.author_id,
+            pub_date=recipe.pub_date
+        ) for user_id in followers.iterator()],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def add_author_to_feed(user_id, author_id):
+    """Заполняет ленту подписчика рецептами автора после подписки."""
+    recipes = Recipe.objects.filter(
+        author_id=author_id
+    ).values_list('id', 'pub_date')
+    FeedEntry.objects.bulk_create(
+        [FeedEntry(
+            user_id=user_id,
+            recipe_id=recipe_id,
+            author_id=author_id,
+            pub_date=pub_date
+        ) for recipe_id, pub_date in recipes.iterator()],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def remove_author_from_feed(user_id, author_id):
+    """Убирает из ленты рецепты автора после отписки."""
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def calculate_feed_entries():
+    """Записи лент по текущим подпискам, без учёта сохранённых."""
+    return Recipe.objects.filter(
+        author__following__isnull=False
+    ).values_list(
+        'author__following__user_id', 'id', 'author_id', 'pub_date'
+    ).order_by()
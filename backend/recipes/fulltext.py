@@ -0,0 +1,121 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Recipe
+
+RECIPE_TABLE = Recipe._meta.db_table
+FTS_TABLE = f'{RECIPE_TABLE}_fts'
+WORD_PATTERN = re.compile(r'\w+')
+BATCH_SIZE = 500
+
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector(%s, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector(%s, coalesce(text, '')), 'B')"
+)
+
+
+def update_search_index(recipe):
+    """Обновляет поисковый индекс рецепта после создания или изменения.
+
+    В PostgreSQL индексом служит столбец search_vector с индексом GIN,
+    в SQLite - таблица FTS5 с rowid, равным id рецепта.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'UPDATE {RECIPE_TABLE} SET search_vector = '
+                f'{POSTGRES_VECTOR} WHERE id = %s',
+                [settings.SEARCH_CONFIG, settings.SEARCH_CONFIG, recipe.id]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [recipe.id]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, text) '
+                f'VALUES (%s, %s, %s)',
+                [recipe.id, recipe.name, recipe.text]
+            )
+
+
+def update_search_index_bulk(recipe_ids):
+    """Обновляет поисковый индекс рецептов, созданных в обход сигналов."""
+    recipe_ids = list(recipe_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(recipe_ids), BATCH_SIZE):
+            batch = recipe_ids[start:start + BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    f'UPDATE {RECIPE_TABLE} SET search_vector = '
+                    f'{POSTGRES_VECTOR} WHERE id IN ({placeholders})',
+                    [settings.SEARCH_CONFIG, settings.SEARCH_CONFIG, *batch]
+                )
+            elif connection.vendor == 'sqlite':
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} '
+                    f'WHERE rowid IN ({placeholders})',
+                    batch
+                )
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, name, text) '
+                    f'SELECT id, name, text FROM {RECIPE_TABLE} '
+                    f'WHERE id IN ({placeholders})',
+                    batch
+                )
+
+
+def delete_from_search_index(recipe_id):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [recipe_id]
+            )
+
+
+def search_recipes(queryset, query):
+    """Рецепты, подходящие под запрос, от более к менее релевантным.
+
+    Каждое слово запроса ищется как начало слова, одинаково в
+    PostgreSQL и SQLite.
+    """
+    words = WORD_PATTERN.findall(query)
+    if not words:
+        return queryset
+    if connection.vendor == 'postgresql':
+        tsquery = 'to_tsquery(%s, %s)'
+        match = ' & '.join(f'{word}:*' for word in words)
+        params = (settings.SEARCH_CONFIG, match)
+        found = f'{RECIPE_TABLE}.search_vector @@ {tsquery}'
+        rank = RawSQL(
+            f'ts_rank({RECIPE_TABLE}.search_vector, {tsquery})',
+            params,
+            output_field=FloatField()
+        )
+    elif connection.vendor == 'sqlite':
+        match = ' '.join(f'"{word}"*' for word in words)
+        params = (match,)
+        found = (
+            f'{RECIPE_TABLE}.id IN '
+            f'(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)'
+        )
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s '
+            f'AND rowid = {RECIPE_TABLE}.id',
+            params,
+            output_field=FloatField()
+        )
+    else:
+        condition = Q()
+        for word in words:
+            condition &= Q(name__icontains=word) | Q(text__icontains=word)
+        return queryset.filter(condition)
+    return queryset.annotate(
+        search_match=RawSQL(found, params, output_field=BooleanField()),
+        search_rank=rank
+    ).filter(search_match=True).order_by('-search_rank', '-pub_date', '-id')
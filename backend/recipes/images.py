@@ -0,0 +1,128 @@
+import logging
+import os
+import queue
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_FORMATS = {
+    'jpeg': ('JPEG', 'jpg'),
+    'webp': ('WEBP', 'webp'),
+}
+
+
+def thumbnail_name(name, size, image_format):
+    """Путь уменьшенной копии картинки name в хранилище."""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    extension = THUMBNAIL_FORMATS[image_format][1]
+    return os.path.join(directory, 'thumbs', f'{stem}_{size}.{extension}')
+
+
+def thumbnail_names(name):
+    return {
+        size: {
+            image_format: thumbnail_name(name, size, image_format)
+            for image_format in THUMBNAIL_FORMATS
+        }
+        for size in settings.RECIPE_THUMBNAIL_SIZES
+    }
+
+
+def mark_thumbnails_ready(name):
+    """Отмечает у рецептов с картинкой name, что копии готовы."""
+    Recipe.objects.filter(image=name).update(thumbnails_image=name)
+
+
+def process_image(name):
+    generate_thumbnails(name)
+    mark_thumbnails_ready(name)
+
+
+def thumbnails_exist(name):
+    """Готовы ли копии: последней записывается самая большая WebP."""
+    size = max(settings.RECIPE_THUMBNAIL_SIZES.items(), key=lambda x: x[1])
+    return default_storage.exists(thumbnail_name(name, size[0], 'webp'))
+
+
+def generate_thumbnails(name):
+    with default_storage.open(name) as file:
+        original = Image.open(file)
+        original.load()
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA')
+    sizes = sorted(
+        settings.RECIPE_THUMBNAIL_SIZES.items(), key=lambda x: x[1]
+    )
+    for size, width in sizes:
+        image = original.copy()
+        image.thumbnail((width, width * 2))
+        for image_format, (pil_format, _) in THUMBNAIL_FORMATS.items():
+            if pil_format == 'JPEG' and image.mode == 'RGBA':
+                converted = Image.new('RGB', image.size, 'white')
+                converted.paste(image, mask=image.split()[3])
+            else:
+                converted = image
+            buffer = BytesIO()
+            converted.save(
+                buffer,
+                pil_format,
+                quality=settings.RECIPE_THUMBNAIL_QUALITY
+            )
+            path = thumbnail_name(name, size, image_format)
+            default_storage.delete(path)
+            default_storage.save(path, ContentFile(buffer.getvalue()))
+
+
+class ImageQueue:
+    """Очередь обработки картинок в фоновом потоке процесса."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def put(self, name):
+        self._start()
+        self._queue.put(name)
+
+    def join(self):
+        self._queue.join()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._work,
+                    name='recipe-images',
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _work(self):
+        while True:
+            name = self._queue.get()
+            try:
+                process_image(name)
+            except Exception:
+                logger.exception('Не удалось обработать картинку %s', name)
+            finally:
+                connection.close()
+                self._queue.task_done()
+
+
+image_queue = ImageQueue()
+
+
+def schedule_thumbnails(name):
+    """Ставит картинку в очередь после фиксации транзакции."""
+    transaction.on_commit(lambda: image_queue.put(name))
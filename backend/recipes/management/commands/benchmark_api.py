@@ -0,0 +1,191 @@
+import json
+import math
+import time
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, Tag
+
+User = get_user_model()
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга, values отсортированы."""
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер времени ответа и числа запросов к базе основных '
+        'эндпоинтов API, результат - JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--user',
+            help='Имя пользователя, по умолчанию - с наибольшим '
+                 'числом подписок.'
+        )
+        parser.add_argument('--output', help='Файл для результата.')
+        parser.add_argument(
+            '--compare',
+            help='Файл с прошлым результатом для сравнения.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый рост p95 при сравнении, доля.'
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('Нужна хотя бы одна итерация.')
+        user = self.get_user(options['user'])
+        client = APIClient()
+        client.force_authenticate(user)
+        results = {}
+        for name, path in self.get_scenarios():
+            results[name] = self.measure(
+                client, path, options['warmup'], options['iterations']
+            )
+        report = {
+            'vendor': connection.vendor,
+            'iterations': options['iterations'],
+            'scenarios': results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        else:
+            print(output)
+        if options['compare']:
+            self.compare(options['compare'], results, options['threshold'])
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+        else:
+            user = User.objects.annotate(
+                follows=Count('follower')
+            ).order_by('-follows', 'id').first()
+        if user is None:
+            raise CommandError(
+                'Нет пользователя для замеров, запустите seed_data.'
+            )
+        return user
+
+    def get_scenarios(self):
+        recipe = Recipe.objects.order_by('-favorites_count', 'id').first()
+        tags = list(Tag.objects.order_by('id')[:2])
+        ingredient = Ingredient.objects.order_by('id').first()
+        if recipe is None or not tags or ingredient is None:
+            raise CommandError('Нет данных для замеров, запустите seed_data.')
+        page = max(min(Recipe.objects.count() // 6, 10), 1)
+        ingredient_ids = recipe.recipes.values_list(
+            'ingredient_id', flat=True
+        )[:3]
+        return [
+            ('recipes_list', '/api/recipes/'),
+            ('recipes_list_deep_page', f'/api/recipes/?page={page}'),
+            ('recipes_keyset', '/api/recipes/?cursor='),
+            (
+                'recipes_filtered',
+                f'/api/recipes/?tags={tags[0].slug}&is_favorited=1'
+            ),
+            ('recipes_by_author', f'/api/recipes/?author={recipe.author_id}'),
+            (
+                'recipes_by_tags_keyset',
+                '/api/recipes/?' + urlencode(
+                    [('tags', tag.slug) for tag in tags] + [('cursor', '')]
+                )
+            ),
+            (
+                'recipes_by_author_tags_keyset',
+                '/api/recipes/?' + urlencode([
+                    ('author', recipe.author_id),
+                    ('tags', tags[0].slug),
+                    ('cursor', ''),
+                ])
+            ),
+            (
+                'recipes_search',
+                '/api/recipes/?' + urlencode({'search': recipe.name})
+            ),
+            ('recipe_detail', f'/api/recipes/{recipe.id}/'),
+            ('recipe_similar', f'/api/recipes/{recipe.id}/similar/'),
+            ('recipes_feed', '/api/recipes/feed/'),
+            (
+                'recipes_cook',
+                '/api/recipes/cook/?' + urlencode({
+                    'ingredients': ','.join(map(str, ingredient_ids))
+                })
+            ),
+            ('subscriptions', '/api/users/subscriptions/?recipes_limit=3'),
+            (
+                'download_shopping_cart',
+                '/api/recipes/download_shopping_cart/'
+            ),
+            (
+                'ingredient_search',
+                '/api/ingredients/?' + urlencode({
+                    'name': ingredient.name[:3]
+                })
+            ),
+        ]
+
+    def measure(self, client, path, warmup, iterations):
+        for _ in range(warmup):
+            self.request(client, path)
+        durations = []
+        queries = []
+        status = None
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                status = self.request(client, path)
+                durations.append((time.perf_counter() - start) * 1000)
+            queries.append(len(context.captured_queries))
+        durations.sort()
+        result = {'path': path, 'status': status, 'queries': max(queries)}
+        for percent in PERCENTILES:
+            result[f'p{percent}_ms'] = round(percentile(durations, percent), 2)
+        result['mean_ms'] = round(sum(durations) / len(durations), 2)
+        return result
+
+    def request(self, client, path):
+        response = client.get(path)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        if response.status_code >= 400:
+            raise CommandError(f'{path}: ответ {response.status_code}.')
+        return response.status_code
+
+    def compare(self, filename, results, threshold):
+        with open(filename, encoding='utf-8') as file:
+            baseline = json.load(file)['scenarios']
+        regressions = []
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            change = result['p95_ms'] / previous['p95_ms'] - 1
+            print(
+                f'{name}: p95 {previous["p95_ms"]} -> {result["p95_ms"]} мс '
+                f'({change:+.0%}), запросов {previous["queries"]} -> '
+                f'{result["queries"]}'
+            )
+            if change > threshold or result['queries'] > previous['queries']:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(f'Регрессии: {", ".join(regressions)}.')
@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from recipes.similarity import rebuild_similar_recipes
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт похожих рецептов по общим ингредиентам и тегам.'
+
+    @transaction.atomic()
+    def handle(self, *args, **options):
+        created = rebuild_similar_recipes()
+        print(f'Похожие рецепты пересчитаны, записей: {created}.')
@@ -0,0 +1,79 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recipes.models import (FavoriteRecipe, FeedEntry, Ingredient, Recipe,
+                            ShoppingCart)
+
+
+def unique_index(model, name):
+    """Имя индекса ограничения уникальности в текущей базе.
+
+    SQLite создаёт для ограничений безымянные индексы sqlite_autoindex_*.
+    """
+    if connection.vendor == 'sqlite':
+        return f'sqlite_autoindex_{model._meta.db_table}'
+    return name
+
+
+def get_hot_queries():
+    """Частые запросы и индексы, которые они должны использовать."""
+    feed = Recipe.objects.order_by('-pub_date', '-id')
+    queries = [
+        (
+            'Лента рецептов',
+            feed[:6],
+            'recipe_pub_date_id_idx'
+        ),
+        (
+            'Рецепты автора',
+            feed.filter(author_id=1)[:6],
+            'recipe_author_pub_date_idx'
+        ),
+        (
+            'Лента подписок',
+            FeedEntry.objects.filter(user_id=1).order_by(
+                '-pub_date', '-recipe_id'
+            )[:6],
+            'feed_user_pub_date_idx'
+        ),
+        (
+            'Рецепт в избранном',
+            FavoriteRecipe.objects.filter(user_id=1, recipe_id=1).values('id'),
+            unique_index(FavoriteRecipe, 'unique_favorite')
+        ),
+        (
+            'Рецепт в списке покупок',
+            ShoppingCart.objects.filter(user_id=1, recipe_id=1).values('id'),
+            unique_index(ShoppingCart, 'unique_cart_recipe')
+        ),
+    ]
+    if connection.vendor == 'postgresql':
+        queries.append((
+            'Поиск ингредиента',
+            Ingredient.objects.filter(name__icontains='сах'),
+            'ingredient_name_trgm_idx'
+        ))
+    return queries
+
+
+class Command(BaseCommand):
+    help = 'Проверка по EXPLAIN, что частые запросы используют индексы.'
+
+    def handle(self, *args, **kwargs):
+        failed = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for title, queryset, index in get_hot_queries():
+                plan = queryset.explain()
+                used = index in plan
+                print(f'{title}: {index} - {"да" if used else "нет"}')
+                if not used:
+                    print(plan)
+                    failed.append(title)
+        if failed:
+            raise CommandError(
+                f'Индексы не используются: {", ".join(failed)}.'
+            )
+        print('Все индексы используются.')
@@ -0,0 +1,35 @@
+from django.core.management import BaseCommand
+
+from recipes.images import (mark_thumbnails_ready, process_image,
+                            thumbnails_exist)
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создание уменьшенных копий картинок рецептов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать уже существующие копии.'
+        )
+
+    def handle(self, *args, **options):
+        names = Recipe.objects.exclude(image='').order_by().values_list(
+            'image', flat=True
+        ).distinct()
+        created = 0
+        failed = 0
+        for name in names.iterator():
+            if not options['force'] and thumbnails_exist(name):
+                mark_thumbnails_ready(name)
+                continue
+            try:
+                process_image(name)
+            except (OSError, ValueError) as error:
+                failed += 1
+                print(f'Ошибка обработки {name}: {error}')
+            else:
+                created += 1
+        print(f'Обработано картинок: {created}, с ошибками: {failed}.')
@@ -1,8 +1,8 @@
-from csv import DictReader
-
 from django.core.management import BaseCommand
 
+from recipes.catalog import read_catalog, sync_ingredients
 from recipes.models import Ingredient
+from recipes.search import ingredient_index
 
 ALREADY_LOADED_ERROR_MESSAGE = 'В базе уже есть данные.'
 
@@ -10,20 +10,26 @@ ALREADY_LOADED_ERROR_MESSAGE = 'В базе уже есть данные.'
 class Command(BaseCommand):
     help = 'Загрузка из csv файла'
 
-    def handle(self, *args, **kwargs):
-        if Ingredient.objects.exists():
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Добавить недостающие ингредиенты в непустую базу.'
+        )
+        parser.add_argument('--file', default='./data/ingredients.csv')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not options['sync'] and Ingredient.objects.exists():
             print(ALREADY_LOADED_ERROR_MESSAGE)
             return
-        try:
-            with open(
-                './data/ingredients.csv',
-                'r',
-                encoding='utf-8'
-            ) as file:
-                reader = DictReader(file)
-                Ingredient.objects.bulk_create(
-                    Ingredient(**data) for data in reader)
-        except ValueError:
-            print('Ошибка введенных данных.')
-        else:
-            print('Загрузка окончена.')
+        stats = sync_ingredients(
+            read_catalog(options['file']), options['batch_size']
+        )
+        if stats['inserted']:
+            ingredient_index.invalidate()
+        print(
+            f'Загрузка окончена. Добавлено: {stats["inserted"]}, '
+            f'без изменений: {stats["unchanged"]}, '
+            f'пропущено строк: {stats["skipped"]}.'
+        )
@@ -1,6 +1,7 @@
 from django.core.management import BaseCommand
 
 from recipes.models import Tag
+from recipes.versions import bump_version
 
 
 class Command(BaseCommand):
@@ -17,4 +18,5 @@ class Command(BaseCommand):
         except ValueError:
             print('Ошибка введенных данных.')
         else:
+            bump_version(Tag)
             print('Создание тегов окончено.')
@@ -0,0 +1,87 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.cart import calculate_cart_totals
+from recipes.models import ShoppingCartTotal
+
+BATCH_SIZE = 1000
+MISMATCHES_TO_SHOW = 10
+
+
+def compare(expected, actual):
+    """Сравнивает два отсортированных по ключу потока (ключ, количество)."""
+    expected, actual = iter(expected), iter(actual)
+    left, right = next(expected, None), next(actual, None)
+    while left is not None or right is not None:
+        if right is None or (left is not None and left[0] < right[0]):
+            yield left[0], left[1], 0
+            left = next(expected, None)
+        elif left is None or right[0] < left[0]:
+            yield right[0], 0, right[1]
+            right = next(actual, None)
+        else:
+            if left[1] != right[1]:
+                yield left[0], left[1], right[1]
+            left, right = next(expected, None), next(actual, None)
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт итогов списков покупок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Только сверить сохранённые итоги с корзинами.'
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            self.verify()
+        else:
+            self.rebuild()
+
+    @transaction.atomic()
+    def rebuild(self):
+        ShoppingCartTotal.objects.all().delete()
+        created = 0
+        batch = []
+        for row in calculate_cart_totals().iterator():
+            batch.append(ShoppingCartTotal(
+                user_id=row['user_id'],
+                ingredient_id=row['ingredient_id'],
+                amount=row['total']
+            ))
+            if len(batch) >= BATCH_SIZE:
+                ShoppingCartTotal.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        ShoppingCartTotal.objects.bulk_create(batch)
+        created += len(batch)
+        print(f'Итоги пересчитаны, записей: {created}.')
+
+    def verify(self):
+        expected = (
+            ((row['user_id'], row['ingredient_id']), row['total'])
+            for row in calculate_cart_totals().iterator()
+        )
+        actual = (
+            ((user_id, ingredient_id), amount)
+            for user_id, ingredient_id, amount
+            in ShoppingCartTotal.objects.order_by(
+                'user_id', 'ingredient_id'
+            ).values_list('user_id', 'ingredient_id', 'amount').iterator()
+        )
+        mismatches = 0
+        for (user_id, ingredient_id), need, stored in compare(
+            expected, actual
+        ):
+            mismatches += 1
+            if mismatches <= MISMATCHES_TO_SHOW:
+                print(
+                    f'Пользователь {user_id}, ингредиент {ingredient_id}: '
+                    f'ожидается {need}, сохранено {stored}'
+                )
+        if mismatches:
+            raise CommandError(f'Расхождений: {mismatches}.')
+        print('Итоги совпадают с корзинами.')
@@ -0,0 +1,33 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from recipes.feed import calculate_feed_entries
+from recipes.models import FeedEntry
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересборка лент рецептов по подпискам.'
+
+    @transaction.atomic()
+    def handle(self, *args, **options):
+        FeedEntry.objects.all().delete()
+        created = 0
+        batch = []
+        for user_id, recipe_id, author_id, pub_date in (
+            calculate_feed_entries().iterator()
+        ):
+            batch.append(FeedEntry(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                pub_date=pub_date
+            ))
+            if len(batch) >= BATCH_SIZE:
+                FeedEntry.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        FeedEntry.objects.bulk_create(batch)
+        created += len(batch)
+        print(f'Ленты пересобраны, записей: {created}.')
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from recipes.counters import count_subquery
+from recipes.models import FavoriteRecipe, Recipe, ShoppingCart
+from users.models import Follow, UserStats
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт счётчиков рецептов и пользователей.'
+
+    @transaction.atomic()
+    def handle(self, *args, **kwargs):
+        recipe_counters = {
+            'favorites_count': count_subquery(FavoriteRecipe, 'recipe'),
+            'in_carts_count': count_subquery(ShoppingCart, 'recipe'),
+        }
+        fixed = self.recount(Recipe.objects.all(), recipe_counters)
+        print(f'Исправлено рецептов: {fixed}.')
+
+        UserStats.objects.bulk_create(
+            (UserStats(user_id=user_id) for user_id in User.objects.filter(
+                stats__isnull=True
+            ).values_list('id', flat=True).iterator()),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        user_counters = {
+            'recipes_count': count_subquery(Recipe, 'author', 'user_id'),
+            'followers_count': count_subquery(Follow, 'author', 'user_id'),
+        }
+        fixed = self.recount(UserStats.objects.all(), user_counters)
+        print(f'Исправлено пользователей: {fixed}.')
+
+    def recount(self, queryset, counters):
+        drifted = queryset.annotate(**{
+            f'actual_{field}': expression
+            for field, expression in counters.items()
+        }).exclude(**{
+            field: F(f'actual_{field}') for field in counters
+        }).values('pk')
+        return queryset.filter(pk__in=drifted).update(**counters)
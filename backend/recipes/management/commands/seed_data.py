@@ -0,0 +1,200 @@
+import random
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection, transaction
+from PIL import Image
+
+from recipes.fulltext import update_search_index_bulk
+from recipes.models import (FavoriteRecipe, Ingredient, IngredientAmount,
+                            Recipe, ShoppingCart, Tag)
+from recipes.search import recipe_ingredient_index
+from users.models import Follow
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+IMAGE_NAME = 'recipes/images/seed.png'
+PASSWORD = 'seed-password'
+DISHES = (
+    'суп', 'салат', 'пирог', 'рагу', 'омлет', 'каша', 'запеканка',
+    'плов', 'борщ', 'паста', 'котлеты', 'блины', 'ризотто', 'гуляш',
+)
+ADJECTIVES = (
+    'домашний', 'быстрый', 'весенний', 'пряный', 'лёгкий', 'сытный',
+    'острый', 'нежный', 'деревенский', 'праздничный', 'летний',
+)
+WORDS = (
+    'нарезать', 'обжарить', 'добавить', 'посолить', 'перемешать',
+    'довести', 'до', 'кипения', 'запекать', 'минут', 'подавать',
+    'горячим', 'с', 'зеленью', 'на', 'среднем', 'огне', 'тушить',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создание синтетических пользователей, рецептов, подписок, '
+        'избранного и списков покупок для нагрузочных замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument(
+            '--follows', type=int, default=10,
+            help='Подписок на пользователя.'
+        )
+        parser.add_argument(
+            '--favorites', type=int, default=20,
+            help='Избранных рецептов на пользователя.'
+        )
+        parser.add_argument(
+            '--cart', type=int, default=5,
+            help='Рецептов в списке покупок на пользователя.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имён создаваемых пользователей.'
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        tag_ids = list(Tag.objects.order_by('id').values_list('id', flat=True))
+        ingredient_ids = list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+        if not tag_ids or not ingredient_ids:
+            raise CommandError(
+                'Сначала загрузите теги и ингредиенты: '
+                'load_tags, load_ingredients.'
+            )
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(
+                f'Пользователи с префиксом {self.prefix} уже есть.'
+            )
+        if options['users'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь.')
+        self.save_image()
+        with transaction.atomic():
+            user_ids = self.create_users(options['users'])
+            recipe_ids = self.create_recipes(
+                options['recipes'], user_ids, tag_ids, ingredient_ids
+            )
+            self.create_follows(user_ids, options['follows'])
+            for model, count in (
+                (FavoriteRecipe, options['favorites']),
+                (ShoppingCart, options['cart']),
+            ):
+                self.create_user_recipes(model, user_ids, recipe_ids, count)
+            update_search_index_bulk(recipe_ids)
+            for command in (
+                'recount_counters',
+                'rebuild_cart_totals',
+                'rebuild_feeds',
+                'build_similar_recipes',
+            ):
+                call_command(command)
+        recipe_ingredient_index.reset()
+        print(
+            f'Создано пользователей: {len(user_ids)}, '
+            f'рецептов: {len(recipe_ids)}.'
+        )
+
+    def save_image(self):
+        if default_storage.exists(IMAGE_NAME):
+            return
+        buffer = BytesIO()
+        Image.new('RGB', (640, 480), (230, 200, 160)).save(buffer, 'PNG')
+        default_storage.save(IMAGE_NAME, ContentFile(buffer.getvalue()))
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        self.bulk_create(User, [
+            User(
+                username=f'{self.prefix}{number}',
+                email=f'{self.prefix}{number}@example.com',
+                first_name=self.random.choice(ADJECTIVES).capitalize(),
+                last_name=f'Повар {number}',
+                password=password
+            ) for number in range(count)
+        ])
+        return list(User.objects.filter(
+            username__startswith=self.prefix
+        ).order_by('id').values_list('id', flat=True))
+
+    def create_recipes(self, count, user_ids, tag_ids, ingredient_ids):
+        self.bulk_create(Recipe, [
+            Recipe(
+                author_id=self.random.choice(user_ids),
+                name=(
+                    f'{self.random.choice(ADJECTIVES).capitalize()} '
+                    f'{self.random.choice(DISHES)}'
+                ),
+                image=IMAGE_NAME,
+                text=' '.join(self.random.choices(WORDS, k=30)),
+                cooking_time=self.random.randint(5, 180)
+            ) for _ in range(count)
+        ])
+        recipe_ids = list(Recipe.objects.filter(
+            author_id__in=user_ids
+        ).order_by('id').values_list('id', flat=True))
+        RecipeTag = Recipe.tags.through
+        tags = []
+        amounts = []
+        for recipe_id in recipe_ids:
+            for tag_id in self.random.sample(
+                tag_ids, self.random.randint(1, len(tag_ids))
+            ):
+                tags.append(RecipeTag(recipe_id=recipe_id, tag_id=tag_id))
+            for ingredient_id in self.random.sample(
+                ingredient_ids,
+                min(self.random.randint(3, 12), len(ingredient_ids))
+            ):
+                amounts.append(IngredientAmount(
+                    recipe_id=recipe_id,
+                    ingredient_id=ingredient_id,
+                    amount=self.random.randint(1, 500)
+                ))
+        self.bulk_create(RecipeTag, tags)
+        self.bulk_create(IngredientAmount, amounts)
+        return recipe_ids
+
+    def create_follows(self, user_ids, count):
+        follows = []
+        for user_id in user_ids:
+            authors = self.random.sample(
+                user_ids, min(count + 1, len(user_ids))
+            )
+            follows.extend(
+                Follow(user_id=user_id, author_id=author_id)
+                for author_id in [
+                    author_id for author_id in authors if author_id != user_id
+                ][:count]
+            )
+        self.bulk_create(Follow, follows)
+
+    def create_user_recipes(self, model, user_ids, recipe_ids, count):
+        self.bulk_create(model, [
+            model(user_id=user_id, recipe_id=recipe_id)
+            for user_id in user_ids
+            for recipe_id in self.random.sample(
+                recipe_ids, min(count, len(recipe_ids))
+            )
+        ])
+
+    def bulk_create(self, model, objs):
+        """bulk_create с пачками не больше лимита параметров базы."""
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        model.objects.bulk_create(objs, batch_size=min(
+            BATCH_SIZE,
+            connection.ops.bulk_batch_size(fields, range(BATCH_SIZE))
+        ))
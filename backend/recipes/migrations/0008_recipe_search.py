@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import migrations
+
+RECIPE_TABLE = 'recipes_recipe'
+FTS_TABLE = 'recipes_recipe_fts'
+SEARCH_INDEX = 'recipe_search_vector_idx'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'ALTER TABLE {RECIPE_TABLE} ADD COLUMN search_vector tsvector'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {SEARCH_INDEX} ON {RECIPE_TABLE} '
+            f'USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            f"UPDATE {RECIPE_TABLE} SET search_vector = "
+            f"setweight(to_tsvector(%s, coalesce(name, '')), 'A') || "
+            f"setweight(to_tsvector(%s, coalesce(text, '')), 'B')",
+            [settings.SEARCH_CONFIG, settings.SEARCH_CONFIG]
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(name, text)'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, text) '
+            f'SELECT id, name, text FROM {RECIPE_TABLE}'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'ALTER TABLE {RECIPE_TABLE} DROP COLUMN search_vector'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
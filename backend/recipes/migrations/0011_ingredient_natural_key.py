@@ -0,0 +1,55 @@
+# Generated by Django 2.2.27 on 2026-10-17 06:18
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientAmount = apps.get_model('recipes', 'IngredientAmount')
+    ShoppingCartTotal = apps.get_model('recipes', 'ShoppingCartTotal')
+    duplicates = Ingredient.objects.values(
+        'name', 'measurement_unit'
+    ).annotate(count=Count('id'), keep=Min('id')).filter(count__gt=1)
+    for group in duplicates:
+        keep = group['keep']
+        others = list(Ingredient.objects.filter(
+            name=group['name'],
+            measurement_unit=group['measurement_unit']
+        ).exclude(id=keep).values_list('id', flat=True))
+        for model, owner in (
+            (IngredientAmount, 'recipe_id'),
+            (ShoppingCartTotal, 'user_id'),
+        ):
+            kept = {
+                getattr(row, owner): row
+                for row in model.objects.filter(ingredient_id=keep)
+            }
+            for row in model.objects.filter(ingredient_id__in=others):
+                target = kept.get(getattr(row, owner))
+                if target is None:
+                    row.ingredient_id = keep
+                    row.save(update_fields=['ingredient'])
+                    kept[getattr(row, owner)] = row
+                else:
+                    target.amount += row.amount
+                    target.save(update_fields=['amount'])
+                    row.delete()
+        Ingredient.objects.filter(id__in=others).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_similarrecipe'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient_name_unit'),
+        ),
+    ]
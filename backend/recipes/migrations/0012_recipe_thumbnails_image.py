@@ -0,0 +1,18 @@
+# Generated by Django 2.2.27 on 2026-10-17 06:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_ingredient_natural_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='thumbnails_image',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Картинка с готовыми уменьшенными копиями'),
+        ),
+    ]
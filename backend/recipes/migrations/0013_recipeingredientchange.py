@@ -0,0 +1,25 @@
+# Generated by Django 2.2.27 on 2026-10-17 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_recipe_thumbnails_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeIngredientChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipe_id', models.PositiveIntegerField(verbose_name='Рецепт')),
+                ('changed_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'Изменение состава рецепта',
+                'verbose_name_plural': 'Изменения состава рецептов',
+            },
+        ),
+    ]
@@ -0,0 +1,242 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from foodgram.db.routers import primary_reads
+from .models import Ingredient, IngredientAmount, RecipeIngredientChange
+from .versions import bump_version, get_version
+
+
+class IngredientIndex:
+    """Индекс названий ингредиентов в памяти процесса для автодополнения.
+
+    Сначала выдаются совпадения с начала названия, затем с начала
+    одного из слов, затем совпадения внутри слова. Индекс строится
+    при первом обращении и перестраивается после изменения версии
+    ингредиентов в кеше.
+    """
+
+    def __init__(self, ngram_size=3):
+        self.ngram_size = ngram_size
+        self._lock = threading.Lock()
+        self._version = None
+        self._data = ([], [], {})
+
+    def invalidate(self):
+        """Перестроить индекс после фиксации текущей транзакции."""
+        bump_version(Ingredient)
+
+    def search(self, query, limit=None):
+        query = query.strip().casefold()
+        if not query:
+            return []
+        if limit is None:
+            limit = settings.INGREDIENT_SEARCH_LIMIT
+        names, ingredients, ngrams = self._get_data()
+
+        found = []
+        position = bisect_left(names, query)
+        while (
+            position < len(names)
+            and names[position].startswith(query)
+            and len(found) < limit
+        ):
+            found.append(position)
+            position += 1
+        if len(found) == limit:
+            return [ingredients[position] for position in found]
+
+        word_matches = []
+        inner_matches = []
+        for position in self._candidates(query, names, ngrams):
+            name = names[position]
+            start = name.find(query)
+            if start <= 0:
+                continue
+            if name[start - 1].isalnum():
+                inner_matches.append((start, position))
+            else:
+                word_matches.append(position)
+        found.extend(word_matches)
+        found.extend(position for _, position in sorted(inner_matches))
+        return [ingredients[position] for position in found[:limit]]
+
+    def _get_data(self):
+        version = get_version(Ingredient)
+        if self._version != version:
+            with self._lock, primary_reads():
+                if self._version != version:
+                    self._data = self._build()
+                    self._version = version
+        return self._data
+
+    def _build(self):
+        ingredients = sorted(
+            Ingredient.objects.all(),
+            key=lambda ingredient: (ingredient.name.casefold(), ingredient.id)
+        )
+        names = [ingredient.name.casefold() for ingredient in ingredients]
+        ngrams = defaultdict(list)
+        for position, name in enumerate(names):
+            for ngram in self._split(name):
+                ngrams[ngram].append(position)
+        return names, ingredients, dict(ngrams)
+
+    def _split(self, text):
+        return {
+            text[start:start + self.ngram_size]
+            for start in range(len(text) - self.ngram_size + 1)
+        }
+
+    def _candidates(self, query, names, ngrams):
+        if len(query) < self.ngram_size:
+            return range(len(names))
+        postings = sorted(
+            (ngrams.get(ngram, []) for ngram in self._split(query)),
+            key=len
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+        return sorted(candidates)
+
+
+class RecipeIngredientIndex:
+    """Обратный индекс ингредиент -> рецепты в памяти процесса.
+
+    Основная часть - для каждого ингредиента отсортированный массив id
+    рецептов и число ингредиентов рецептов - строится целиком при первом
+    обращении. Потом процесс, увидев новую версию ингредиентов рецептов
+    в кеше, читает из журнала RecipeIngredientChange только изменённые
+    рецепты и держит их состав в дополнении: строки таких рецептов в
+    основной части пропускаются. Дополнение больше
+    COOK_INDEX_OVERLAY_LIMIT рецептов, пропуск журнала или reset()
+    приводят к полной перестройке.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._synced_at = None
+        self._data = ({}, array('I'), array('H'), {})
+
+    def invalidate(self, recipe_id):
+        """Записывает изменение рецепта в журнал текущей транзакции.
+
+        Версия меняется после фиксации, и процессы дочитывают журнал.
+        """
+        now = timezone.now()
+        RecipeIngredientChange.objects.filter(changed_at__lt=now - timedelta(
+            seconds=settings.COOK_INDEX_LOG_TIMEOUT
+        )).delete()
+        RecipeIngredientChange.objects.create(recipe_id=recipe_id)
+        bump_version(IngredientAmount)
+
+    def reset(self):
+        """Перестроить индексы всех процессов целиком после фиксации.
+
+        Нужно после массовой записи рецептов мимо журнала.
+        """
+        bump_version(RecipeIngredientChange)
+
+    def search(self, ingredient_ids, limit=None):
+        """Рецепты, для которых нужно меньше всего недостающих продуктов.
+
+        Возвращает список (id рецепта, совпало, не хватает), отсортированный
+        по числу недостающих ингредиентов, затем по числу совпавших.
+        """
+        if limit is None:
+            limit = settings.COOK_SEARCH_LIMIT
+        postings, recipe_ids, sizes, overlay = self._get_data()
+        ingredient_ids = set(ingredient_ids)
+        matched = defaultdict(int)
+        for ingredient_id in ingredient_ids:
+            for recipe_id in postings.get(ingredient_id, ()):
+                if recipe_id not in overlay:
+                    matched[recipe_id] += 1
+        found = [
+            (recipe_id, count,
+             sizes[bisect_left(recipe_ids, recipe_id)] - count)
+            for recipe_id, count in matched.items()
+        ]
+        for recipe_id, ingredients in overlay.items():
+            count = len(ingredients & ingredient_ids)
+            if count:
+                found.append((recipe_id, count, len(ingredients) - count))
+        return heapq.nsmallest(
+            limit,
+            found,
+            key=lambda item: (item[2], -item[1], -item[0])
+        )
+
+    def _get_data(self):
+        version = (
+            get_version(RecipeIngredientChange),
+            get_version(IngredientAmount)
+        )
+        if self._version != version:
+            with self._lock, primary_reads():
+                if self._version != version:
+                    self._sync(
+                        rebuild=self._version is None
+                        or self._version[0] != version[0]
+                    )
+                    self._version = version
+        return self._data
+
+    def _sync(self, rebuild):
+        """Дочитывает журнал с запасом на долгие транзакции.
+
+        Запись журнала получает время до фиксации, поэтому рецепты,
+        изменённые за COOK_INDEX_SYNC_MARGIN секунд до прошлой
+        синхронизации, читаются ещё раз.
+        """
+        started = timezone.now()
+        margin = timedelta(seconds=settings.COOK_INDEX_SYNC_MARGIN)
+        if rebuild or (
+            started - self._synced_at + margin
+            > timedelta(seconds=settings.COOK_INDEX_LOG_TIMEOUT)
+        ):
+            self._data = self._build()
+            self._synced_at = started
+            return
+        postings, recipe_ids, sizes, overlay = self._data
+        changed = set(RecipeIngredientChange.objects.filter(
+            changed_at__gte=self._synced_at - margin
+        ).values_list('recipe_id', flat=True))
+        if len(changed | overlay.keys()) > settings.COOK_INDEX_OVERLAY_LIMIT:
+            self._data = self._build()
+            self._synced_at = started
+            return
+        overlay = {**overlay, **{recipe_id: set() for recipe_id in changed}}
+        for recipe_id, ingredient_id in IngredientAmount.objects.filter(
+            recipe_id__in=changed
+        ).values_list('recipe_id', 'ingredient_id').iterator():
+            overlay[recipe_id].add(ingredient_id)
+        self._data = postings, recipe_ids, sizes, overlay
+        self._synced_at = started
+
+    def _build(self):
+        postings = defaultdict(lambda: array('I'))
+        recipe_ids = array('I')
+        sizes = array('H')
+        for recipe_id, ingredient_id in IngredientAmount.objects.order_by(
+            'recipe_id', 'ingredient_id'
+        ).values_list('recipe_id', 'ingredient_id').iterator():
+            postings[ingredient_id].append(recipe_id)
+            if recipe_ids and recipe_ids[-1] == recipe_id:
+                sizes[-1] += 1
+            else:
+                recipe_ids.append(recipe_id)
+                sizes.append(1)
+        return dict(postings), recipe_ids, sizes, {}
+
+
+ingredient_index = IngredientIndex()
+recipe_ingredient_index = RecipeIngredientIndex()
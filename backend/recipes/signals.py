@@ -0,0 +1,52 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from users.models import UserStats
+from .cart import remove_recipe_from_all_carts
+from .fulltext import delete_from_search_index, update_search_index
+from .images import schedule_thumbnails
+from .models import Ingredient, Recipe, Tag
+from .search import recipe_ingredient_index
+from .versions import bump_version
+
+SEARCH_FIELDS = {'name', 'text'}
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+@receiver([post_save, post_delete], sender=Tag)
+def bump_reference_version(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(post_save, sender=Recipe)
+def index_recipe(instance, update_fields=None, **kwargs):
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        update_search_index(instance)
+
+
+@receiver(pre_delete, sender=Recipe)
+def remove_recipe_from_totals(instance, **kwargs):
+    """Поправки итогов при любом удалении рецепта.
+
+    Срабатывает и при удалении через админку или вместе с автором, пока
+    корзины и ингредиенты рецепта ещё не удалены. Счётчик автора только
+    уменьшается: при удалении автора новая строка статистики осталась бы
+    ссылаться на удалённого пользователя.
+    """
+    remove_recipe_from_all_carts(instance.id)
+    UserStats.objects.filter(
+        user_id=instance.author_id, recipes_count__gt=0
+    ).update(recipes_count=F('recipes_count') - 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def unindex_recipe(instance, **kwargs):
+    delete_from_search_index(instance.id)
+    recipe_ingredient_index.invalidate(instance.id)
+
+
+@receiver(post_save, sender=Recipe)
+def process_recipe_image(instance, update_fields=None, **kwargs):
+    if instance.image and (update_fields is None or 'image' in update_fields):
+        schedule_thumbnails(instance.image.name)
@@ -0,0 +1,171 @@
+import heapq
+from collections import defaultdict
+from math import sqrt
+
+from django.conf import settings
+from django.db.models import Count, Min
+
+from .models import IngredientAmount, Recipe, SimilarRecipe
+
+BATCH_SIZE = 1000
+
+
+def load_features(recipe_ids=None):
+    """Ингредиенты и теги рецептов: {id рецепта: (ингредиенты, теги)}."""
+    features = defaultdict(lambda: (set(), set()))
+    amounts = IngredientAmount.objects.values_list(
+        'recipe_id', 'ingredient_id'
+    ).order_by()
+    tags = Recipe.tags.through.objects.values_list(
+        'recipe_id', 'tag_id'
+    ).order_by()
+    if recipe_ids is not None:
+        amounts = amounts.filter(recipe_id__in=recipe_ids)
+        tags = tags.filter(recipe_id__in=recipe_ids)
+    for recipe_id, ingredient_id in amounts.iterator():
+        features[recipe_id][0].add(ingredient_id)
+    for recipe_id, tag_id in tags.iterator():
+        features[recipe_id][1].add(tag_id)
+    return dict(features)
+
+
+def build_postings(features):
+    """Обратный индекс: {id ингредиента: [id рецептов]}."""
+    postings = defaultdict(list)
+    for recipe_id, (ingredients, _) in features.items():
+        for ingredient_id in ingredients:
+            postings[ingredient_id].append(recipe_id)
+    return postings
+
+
+def vector_norm(ingredients, tags):
+    return sqrt(
+        len(ingredients) + len(tags) * settings.SIMILAR_TAG_WEIGHT ** 2
+    )
+
+
+def score_candidates(recipe_id, features, postings):
+    """Косинусное сходство рецепта с рецептами, где есть общие ингредиенты.
+
+    Рецепт - разреженный вектор: ингредиенты с весом 1 и теги с весом
+    SIMILAR_TAG_WEIGHT. Скалярные произведения набираются по спискам
+    рецептов каждого ингредиента, так что пары без общих ингредиентов
+    не перебираются, а теги лишь добавляют вес найденным парам.
+    """
+    ingredients, tags = features[recipe_id]
+    norm = vector_norm(ingredients, tags)
+    shared = defaultdict(int)
+    for ingredient_id in ingredients:
+        for other_id in postings[ingredient_id]:
+            shared[other_id] += 1
+    shared.pop(recipe_id, None)
+    for other_id, common in shared.items():
+        other_ingredients, other_tags = features[other_id]
+        product = (
+            common
+            + len(tags & other_tags) * settings.SIMILAR_TAG_WEIGHT ** 2
+        )
+        yield other_id, product / (
+            norm * vector_norm(other_ingredients, other_tags)
+        )
+
+
+def top_similar(recipe_id, features, postings):
+    return heapq.nlargest(
+        settings.SIMILAR_RECIPES_LIMIT,
+        score_candidates(recipe_id, features, postings),
+        key=lambda item: (item[1], -item[0])
+    )
+
+
+def rebuild_similar_recipes():
+    """Пересчитывает похожие рецепты для всех рецептов."""
+    features = load_features()
+    postings = build_postings(features)
+    SimilarRecipe.objects.all().delete()
+    created = 0
+    batch = []
+    for recipe_id in features:
+        for similar_id, score in top_similar(recipe_id, features, postings):
+            batch.append(SimilarRecipe(
+                recipe_id=recipe_id,
+                similar_id=similar_id,
+                score=score
+            ))
+        if len(batch) >= BATCH_SIZE:
+            SimilarRecipe.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    SimilarRecipe.objects.bulk_create(batch)
+    created += len(batch)
+    return created
+
+
+def update_similar_recipes(recipe_id):
+    """Обновляет похожие рецепты после изменения ингредиентов или тегов.
+
+    Список самого рецепта пересчитывается точно. В чужие списки рецепт
+    попадает, только если там есть свободное место или его сходство не
+    меньше, чем у последнего рецепта списка, поэтому число записей не
+    зависит от того, у скольких рецептов есть общие ингредиенты. Рецепт,
+    выпавший из чужого списка, место в нём не освобождает до полного
+    пересчёта командой build_similar_recipes.
+    """
+    candidates = IngredientAmount.objects.filter(
+        ingredient_id__in=IngredientAmount.objects.filter(
+            recipe_id=recipe_id
+        ).values('ingredient_id')
+    ).values('recipe_id')
+    candidate_ids = set(candidates.values_list('recipe_id', flat=True))
+    features = load_features(candidate_ids | {recipe_id})
+    postings = build_postings(features)
+    scores = dict(score_candidates(recipe_id, features, postings))
+    SimilarRecipe.objects.filter(recipe_id=recipe_id).delete()
+    SimilarRecipe.objects.filter(similar_id=recipe_id).delete()
+    lists = {
+        row['recipe_id']: row
+        for row in SimilarRecipe.objects.filter(
+            recipe_id__in=candidates
+        ).order_by().values('recipe_id').annotate(
+            count=Count('id'), lowest=Min('score')
+        )
+    }
+    reverse = []
+    full = []
+    for other_id, score in scores.items():
+        row = lists.get(other_id)
+        if row is None or row['count'] < settings.SIMILAR_RECIPES_LIMIT:
+            reverse.append(other_id)
+        elif score >= row['lowest']:
+            reverse.append(other_id)
+            full.append(other_id)
+    SimilarRecipe.objects.bulk_create(
+        [SimilarRecipe(
+            recipe_id=recipe_id,
+            similar_id=similar_id,
+            score=score
+        ) for similar_id, score in top_similar(recipe_id, features, postings)]
+        + [SimilarRecipe(
+            recipe_id=other_id,
+            similar_id=recipe_id,
+            score=scores[other_id]
+        ) for other_id in reverse]
+    )
+    if full:
+        trim_similar_recipes(full)
+
+
+def trim_similar_recipes(recipe_ids):
+    """Оставляет у рецептов не больше SIMILAR_RECIPES_LIMIT похожих."""
+    kept = defaultdict(int)
+    extra = []
+    for pk, recipe_id in SimilarRecipe.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('recipe_id', '-score', 'similar_id').values_list(
+        'pk', 'recipe_id'
+    ):
+        kept[recipe_id] += 1
+        if kept[recipe_id] > settings.SIMILAR_RECIPES_LIMIT:
+            extra.append(pk)
+    if extra:
+        SimilarRecipe.objects.filter(pk__in=extra).delete()
@@ -0,0 +1,95 @@
+import csv
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.tests.base import CACHES, call_command_quietly
+from recipes.catalog import CsvStream, read_catalog, sync_ingredients
+from recipes.models import Ingredient
+
+CATALOG = os.path.join(settings.BASE_DIR, 'data', 'ingredients.csv')
+
+
+class ReadCatalogTest(SimpleTestCase):
+
+    def read(self, text):
+        with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', suffix='.csv', delete=False
+        ) as file:
+            file.write(text)
+        try:
+            return list(read_catalog(file.name))
+        finally:
+            os.remove(file.name)
+
+    def test_header_skipped(self):
+        self.assertEqual(
+            self.read('name,measurement_unit\nсоль,г\n'), [['соль', 'г']]
+        )
+
+    def test_headerless(self):
+        self.assertEqual(
+            self.read('сахар,г\nсоль,г\n'), [['сахар', 'г'], ['соль', 'г']]
+        )
+
+    def test_empty(self):
+        self.assertEqual(self.read(''), [])
+
+    def test_shipped_catalog_has_no_header_rows(self):
+        self.assertNotIn(
+            ['name', 'measurement_unit'], list(read_catalog(CATALOG))
+        )
+
+
+@override_settings(CACHES=CACHES)
+class SyncIngredientsTest(TestCase):
+
+    def test_sync_is_idempotent(self):
+        stats = sync_ingredients(read_catalog(CATALOG), 100)
+        self.assertEqual(stats['inserted'], Ingredient.objects.count())
+        self.assertFalse(Ingredient.objects.filter(name='name').exists())
+        repeated = sync_ingredients(read_catalog(CATALOG), 100)
+        self.assertEqual(repeated['inserted'], 0)
+        self.assertEqual(
+            repeated['unchanged'], stats['inserted'] + stats['unchanged']
+        )
+
+    def test_rows_cleaned(self):
+        rows = [
+            ['сахар', 'г'], ['сахар', 'г'], ['без единицы'], ['', 'г'],
+            ['x' * 201, 'г'], [' соль ', 'г'],
+        ]
+        stats = sync_ingredients(rows, 2)
+        self.assertEqual(
+            dict(stats), {'inserted': 2, 'unchanged': 1, 'skipped': 3}
+        )
+        self.assertTrue(Ingredient.objects.filter(name='соль').exists())
+
+    def test_unique_constraint(self):
+        Ingredient.objects.create(name='сахар', measurement_unit='г')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Ingredient.objects.create(name='сахар', measurement_unit='г')
+
+    def test_command(self):
+        call_command_quietly('load_ingredients', file=CATALOG)
+        count = Ingredient.objects.count()
+        call_command_quietly('load_ingredients', '--sync', file=CATALOG)
+        self.assertEqual(Ingredient.objects.count(), count)
+
+
+class CsvStreamTest(SimpleTestCase):
+
+    def test_chunks(self):
+        rows = [('a,b', 'г'), ('c"d', 'мл')] * 5
+        stream = CsvStream(iter(rows), 3)
+        output = ''
+        chunk = stream.read(7)
+        while chunk:
+            output += chunk
+            chunk = stream.read(7)
+        self.assertEqual(
+            [tuple(row) for row in csv.reader(output.splitlines())], rows
+        )
@@ -0,0 +1,31 @@
+from unittest import mock
+
+from django.core.management import CommandError
+from django.test import TestCase
+
+from api.tests.base import call_command_quietly
+from recipes.management.commands import check_indexes
+from recipes.models import Recipe
+
+
+class CheckIndexesTest(TestCase):
+
+    def test_indexes_used(self):
+        output = call_command_quietly('check_indexes')
+        for title, _, index in check_indexes.get_hot_queries():
+            self.assertIn(f'{title}: {index} - да', output)
+        self.assertIn('Все индексы используются.', output)
+
+    def test_missing_index(self):
+        queries = [(
+            'Рецепты по названию',
+            Recipe.objects.filter(name='Борщ'),
+            'recipe_name_idx'
+        )]
+        with mock.patch.object(
+            check_indexes, 'get_hot_queries', return_value=queries
+        ):
+            with self.assertRaisesMessage(
+                CommandError, 'Индексы не используются: Рецепты по названию.'
+            ):
+                call_command_quietly('check_indexes')
@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError
+from django.test import TestCase, override_settings
+
+from api.tests.base import CACHES, MEDIA_ROOT, call_command_quietly
+from recipes.models import (FavoriteRecipe, Ingredient, Recipe,
+                            ShoppingCart, Tag)
+from users.models import Follow
+
+User = get_user_model()
+
+OPTIONS = {
+    'users': 5, 'recipes': 20, 'follows': 2, 'favorites': 3, 'cart': 2,
+}
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CACHES=CACHES)
+class SeedDataTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(3):
+            Tag.objects.create(
+                name=f'Тег {number}',
+                color=f'#00000{number}',
+                slug=f'tag{number}'
+            )
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(15)
+        )
+
+    def seed(self, prefix, seed):
+        output = call_command_quietly(
+            'seed_data', prefix=prefix, seed=seed, **OPTIONS
+        )
+        self.assertIn('Создано пользователей: 5, рецептов: 20.', output)
+        return self.snapshot(prefix)
+
+    def snapshot(self, prefix):
+        """Созданные данные с номерами вместо id пользователей и рецептов."""
+        users = {
+            user.id: number for number, user in enumerate(
+                User.objects.filter(username__startswith=prefix).order_by('id')
+            )
+        }
+        recipes = {}
+        recipe_rows = []
+        for recipe in Recipe.objects.filter(
+            author_id__in=users
+        ).prefetch_related('tags', 'recipes').order_by('id'):
+            recipes[recipe.id] = len(recipe_rows)
+            recipe_rows.append((
+                users[recipe.author_id],
+                recipe.name,
+                recipe.text,
+                recipe.cooking_time,
+                sorted(tag.id for tag in recipe.tags.all()),
+                sorted(
+                    (amount.ingredient_id, amount.amount)
+                    for amount in recipe.recipes.all()
+                ),
+            ))
+        return {
+            'users': list(User.objects.filter(
+                pk__in=users
+            ).order_by('id').values_list('first_name', 'last_name')),
+            'recipes': recipe_rows,
+            'follows': sorted(
+                (users[user_id], users[author_id])
+                for user_id, author_id in Follow.objects.filter(
+                    user_id__in=users
+                ).values_list('user_id', 'author_id')
+            ),
+            **{
+                name: sorted(
+                    (users[user_id], recipes[recipe_id])
+                    for user_id, recipe_id in model.objects.filter(
+                        user_id__in=users
+                    ).values_list('user_id', 'recipe_id')
+                ) for name, model in (
+                    ('favorites', FavoriteRecipe), ('cart', ShoppingCart)
+                )
+            },
+        }
+
+    def test_same_seed_same_data(self):
+        first = self.seed('first', 1)
+        self.assertEqual(len(first['follows']), 10)
+        self.assertEqual(len(first['favorites']), 15)
+        self.assertEqual(len(first['cart']), 10)
+        self.assertEqual(self.seed('second', 1), first)
+        self.assertNotEqual(self.seed('third', 2), first)
+
+    def test_existing_prefix(self):
+        self.seed('first', 1)
+        with self.assertRaisesMessage(
+            CommandError, 'Пользователи с префиксом first уже есть.'
+        ):
+            call_command_quietly('seed_data', prefix='first', **OPTIONS)
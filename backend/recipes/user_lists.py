@@ -0,0 +1,51 @@
+from django.db import connection
+
+
+def get_columns(model):
+    return (
+        connection.ops.quote_name(model._meta.db_table),
+        connection.ops.quote_name(model._meta.get_field('user').column),
+        connection.ops.quote_name(model._meta.get_field('recipe').column),
+    )
+
+
+def add_to_list(model, user_id, recipe_ids):
+    """Добавляет рецепты в избранное или список покупок пользователя.
+
+    Один INSERT ... ON CONFLICT DO NOTHING RETURNING: возвращает id
+    только реально добавленных рецептов, поэтому два одинаковых
+    параллельных запроса не посчитают одну строку дважды.
+    """
+    if not recipe_ids:
+        return []
+    table, user_column, recipe_column = get_columns(model)
+    values = ', '.join(['(%s, %s)'] * len(recipe_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({user_column}, {recipe_column}) '
+            f'VALUES {values} '
+            f'ON CONFLICT ({user_column}, {recipe_column}) DO NOTHING '
+            f'RETURNING {recipe_column}',
+            [value for recipe_id in recipe_ids
+             for value in (user_id, recipe_id)]
+        )
+        return [recipe_id for recipe_id, in cursor.fetchall()]
+
+
+def remove_from_list(model, user_id, recipe_ids):
+    """Удаляет рецепты из списка пользователя одним DELETE ... RETURNING.
+
+    Возвращает id реально удалённых рецептов.
+    """
+    if not recipe_ids:
+        return []
+    table, user_column, recipe_column = get_columns(model)
+    placeholders = ', '.join(['%s'] * len(recipe_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE {user_column} = %s '
+            f'AND {recipe_column} IN ({placeholders}) '
+            f'RETURNING {recipe_column}',
+            [user_id, *recipe_ids]
+        )
+        return [recipe_id for recipe_id, in cursor.fetchall()]
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_shared_cache():
+    """Версии должны быть видны всем воркерам и командам manage.py."""
+    backend = settings.CACHES['default']['BACKEND']
+    if backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f'Кеш {backend} виден только одному процессу, нужен общий: '
+            f'файловый, memcached или в базе.'
+        )
+
+
+def get_version_key(model):
+    return f'{model._meta.label_lower}:version'
+
+
+def get_version(model):
+    """Время последнего изменения данных модели, хранится в кеше."""
+    key = get_version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(model):
+    """Меняет версию после фиксации транзакции.
+
+    Иначе параллельный запрос успел бы закешировать под новой версией
+    ещё не зафиксированные, то есть старые данные.
+    """
+    key = get_version_key(model)
+    transaction.on_commit(lambda: cache.set(key, time.time(), None))
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
 
-from .models import Follow
+from .models import Follow, UserStats
 
 
 class CustomUserAdmin(UserAdmin):
@@ -17,5 +17,11 @@ class FollowAdmin(admin.ModelAdmin):
     list_filter = ('user', 'author')
 
 
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'recipes_count', 'followers_count')
+    readonly_fields = ('recipes_count', 'followers_count')
+
+
 admin.site.unregister(User)
 admin.site.register(User, CustomUserAdmin)
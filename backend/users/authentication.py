@@ -0,0 +1,52 @@
+import time
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def get_token_cache_key(key):
+    return f'auth:token:{sha256(key.encode()).hexdigest()}'
+
+
+def get_user_changed_key(user_id):
+    return f'auth:user:{user_id}:changed'
+
+
+def invalidate_user(user_id):
+    """Отбрасывает записи кеша пользователя, прочитанные до фиксации.
+
+    Отметка времени изменения живёт дольше записей, поэтому запись,
+    прочитанная из базы до фиксации и положенная в кеш уже после
+    отметки, тоже не будет принята.
+    """
+    transaction.on_commit(lambda: cache.set(
+        get_user_changed_key(user_id),
+        time.time(),
+        settings.TOKEN_CACHE_TIMEOUT * 2
+    ))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Аутентификация по токену с кешем пользователя по токену.
+
+    Запись в кеше живёт TOKEN_CACHE_TIMEOUT секунд и принимается, только
+    если прочитана из базы позже последнего изменения пользователя или
+    его токенов: выхода, смены пароля, деактивации.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = get_token_cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            user, read_at = cached
+            changed_at = cache.get(get_user_changed_key(user.pk))
+            if user.is_active and (changed_at is None or read_at > changed_at):
+                return user, Token(key=key, user=user)
+        read_at = time.time()
+        user, token = super().authenticate_credentials(key)
+        cache.set(cache_key, (user, read_at), settings.TOKEN_CACHE_TIMEOUT)
+        return user, token
@@ -31,3 +31,32 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'Подписчик {self.user} - автор {self.author}'
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        verbose_name='Пользователь',
+        related_name='stats',
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Рецептов',
+        default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Подписчиков',
+        default=0,
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return (
+            f'{self.user}: рецептов {self.recipes_count}, '
+            f'подписчиков {self.followers_count}'
+        )
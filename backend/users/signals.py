@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_user
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def drop_cached_token(instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def drop_cached_user_tokens(instance, created, **kwargs):
+    if not created:
+        invalidate_user(instance.id)
@@ -0,0 +1,14 @@
+from django.db.models import F
+
+from .models import UserStats
+
+
+def change_user_stats(user_id, **deltas):
+    """Атомарно изменяет счётчики пользователя на заданные величины."""
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=user_id)],
+        ignore_conflicts=True
+    )
+    UserStats.objects.filter(user_id=user_id).update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
@@ -0,0 +1,75 @@
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.tests.base import PASSWORD, APITransactionTestCase, User
+from users.authentication import get_token_cache_key
+
+
+class CachedTokenAuthenticationTest(APITransactionTestCase):
+
+    def login(self, user):
+        client = APIClient()
+        response = client.post('/api/auth/token/login/', {
+            'email': user.email, 'password': PASSWORD,
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.token = response.json()['auth_token']
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        return client
+
+    def get_me(self, client):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/users/me/')
+        token_queries = [
+            query for query in context.captured_queries
+            if 'authtoken_token' in query['sql']
+        ]
+        return response.status_code, len(token_queries)
+
+    def test_cached(self):
+        client = self.login(self.users[0])
+        self.assertEqual(self.get_me(client), (200, 1))
+        self.assertEqual(self.get_me(client), (200, 0))
+
+    def test_logout(self):
+        client = self.login(self.users[0])
+        self.get_me(client)
+        response = client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_me(client)[0], 401)
+
+    def test_password_change(self):
+        client = self.login(self.users[0])
+        self.get_me(client)
+        response = client.post('/api/users/set_password/', {
+            'new_password': 'new-Password-456',
+            'current_password': PASSWORD,
+        }, format='json')
+        self.assertEqual(response.status_code, 204, response.content)
+        self.assertEqual(self.get_me(client), (200, 1))
+
+    def test_deactivation(self):
+        user = self.users[0]
+        client = self.login(user)
+        self.get_me(client)
+        user.refresh_from_db()
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.get_me(client)[0], 401)
+
+    def test_entry_read_before_change_rejected(self):
+        user = self.users[0]
+        client = self.login(user)
+        self.get_me(client)
+        stale = User.objects.get(pk=user.pk)
+        read_at = time.time()
+        user.is_active = False
+        user.save()
+        # Запрос прочитал пользователя до деактивации, а положил в кеш
+        # уже после неё.
+        cache.set(get_token_cache_key(self.token), (stale, read_at))
+        self.assertEqual(self.get_me(client)[0], 401)